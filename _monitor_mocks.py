@@ -0,0 +1,51 @@
+"""
+Mock psutil and speedtest modules for development/testing
+
+Imported by network_monitor only when the real libraries are not installed.
+"""
+
+class psutil:
+    @staticmethod
+    def net_io_counters(pernic=False):
+        """Mock network IO counters"""
+        if pernic:
+            return {'eth0': psutil._NIC(0, 0, 0, 0, 0, 0)}
+        return psutil._NIC(1000000, 500000, 1000, 500, 0, 0)
+    
+    class _NIC:
+        def __init__(self, bytes_sent, bytes_recv, packets_sent, packets_recv, errin, errout):
+            self.bytes_sent = bytes_sent
+            self.bytes_recv = bytes_recv
+            self.packets_sent = packets_sent
+            self.packets_recv = packets_recv
+            self.errin = errin
+            self.errout = errout
+
+class speedtest:
+    class Speedtest:
+        def __init__(self):
+            pass
+        
+        def get_best_server(self):
+            return {"host": "test-server.net", "country": "Test Country"}
+        
+        def download(self):
+            return 1500000  # 1.5 Mbps
+        
+        def upload(self):
+            return 750000  # 0.75 Mbps
+        
+        def results(self):
+            return speedtest.SpeedtestResults()
+    
+    class SpeedtestResults:
+        def __init__(self):
+            self.dict = {
+                "download": 1500000,
+                "upload": 750000,
+                "ping": 100,
+                "server": {
+                    "host": "test-server.net",
+                    "country": "Test Country"
+                }
+            }
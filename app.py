@@ -1,195 +1,364 @@
+# gevent has to patch the stdlib before anything imports socket/threading/subprocess
+try:
+    from gevent import monkey
+    monkey.patch_all()
+    from gevent.pywsgi import WSGIServer
+except ImportError:
+    WSGIServer = None
+
 import os
 import logging
 import re
 import json
-from flask import Flask, render_template, request, redirect, url_for, jsonify, flash
+import time
+import queue
+import threading
+import functools
+import subprocess
+from flask import Flask, current_app, render_template, request, redirect, url_for, jsonify
+from flask.json.provider import DefaultJSONProvider
 from datetime import datetime, timedelta
 
 from wireguard_manager import WireGuardManager
 from network_monitor import NetworkMonitor
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Configure logging
 logging.basicConfig(level=logging.DEBUG, 
                     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-# Create Flask app
-app = Flask(__name__)
-app.secret_key = os.environ.get("SESSION_SECRET", "default_secret_key_for_development")
+# Per-reply RTT ("time=12.3 ms", or "time<1ms" on Windows), compiled once and
+# matched against raw bytes so lines never have to be decoded
+_PING_TIME_RE = re.compile(rb'time[=<]([\d.]+)')
+_IS_WINDOWS = os.name == 'nt'
+
+# Force the C locale so localized ping output can't defeat the pattern above
+_PING_ENV = dict(os.environ, LC_ALL='C')
+
+# Resolve the platform-specific flavour once; the count and host are appended per call
+if _IS_WINDOWS:
+    _PING_CMD_TEMPLATE = ['ping', '-w', '1000', '-n']
+    _PING_INTERVAL = 1.0
+else:
+    _PING_CMD_TEMPLATE = ['ping', '-i', '0.2', '-W', '1', '-c']
+    _PING_INTERVAL = 0.2
+
+# Hostnames, IPv4 and IPv6 literals; rejects option-like or oversized input before forking
+_HOST_RE = re.compile(r'[a-zA-Z0-9:][a-zA-Z0-9.\-:]{0,253}')
+
+# Keep /api/network/ping short: few probes, tight spacing, hard cap on count
+PING_DEFAULT_COUNT = 4
+PING_MAX_COUNT = 10
+
+# How long (seconds) polled endpoints may serve a cached result
+STATUS_CACHE_TTL = float(os.environ.get('STATUS_CACHE_TTL', '1.0'))
+CONFIG_CACHE_TTL = float(os.environ.get('CONFIG_CACHE_TTL', '5.0'))
+
+# Seconds a stats stream stays open before the client is made to reconnect
+STATS_STREAM_MAX_AGE = float(os.environ.get('STATS_STREAM_MAX_AGE', '300'))
+
+def ttl_cache(ttl):
+    """
+    Memoize a zero-argument function for `ttl` seconds.
+    
+    Concurrent callers that miss the cache together wait on one lock, so a
+    burst of polls collapses into a single underlying call. The wrapped
+    function gains a `cache_clear()` method for explicit invalidation.
+    """
+    def decorator(func):
+        lock = threading.Lock()
+        state = {'value': None, 'expires': 0.0}
+        
+        @functools.wraps(func)
+        def wrapper():
+            if time.monotonic() < state['expires']:
+                return state['value']
+            with lock:
+                # Another thread may have refreshed it while we waited
+                now = time.monotonic()
+                if now >= state['expires']:
+                    state['value'] = func()
+                    state['expires'] = now + ttl
+                return state['value']
+        
+        def cache_clear():
+            with lock:
+                state['expires'] = 0.0
+        
+        wrapper.cache_clear = cache_clear
+        return wrapper
+    return decorator
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    JSON provider that serializes with orjson.
+    
+    Keys are sorted and datetimes go through Flask's own `default` hook (as
+    HTTP dates), like the stdlib provider. What still differs: NaN and
+    infinity are written as null instead of NaN/Infinity, integers outside
+    the 64-bit range raise instead of serializing, and `dumps` output has no
+    spaces after separators.
+    """
+    
+    def _option(self, indent=False):
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return option
+    
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default, option=self._option(kwargs.get('indent'))).decode()
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+    
+    def response(self, *args, **kwargs):
+        """Build a `jsonify` response from orjson's bytes, without a str round trip"""
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = self.compact is False or (self.compact is None and self._app.debug)
+        body = orjson.dumps(obj, default=self.default, option=self._option(indent))
+        return self._app.response_class(body + b"\n", mimetype=self.mimetype)
+
+__all__ = ['create_app', 'get_managers', 'serve']
+
+# WireGuard manager and network monitor are created on first use, so importing
+# this module (tests, tooling, main.py's script loader) never probes the system
+_managers = None
+_managers_lock = threading.Lock()
 
-# Initialize WireGuard manager and network monitor
-wg_manager = WireGuardManager()
-network_monitor = NetworkMonitor()
+def get_managers():
+    """Return the shared (WireGuardManager, NetworkMonitor) pair, creating it once"""
+    global _managers
+    if _managers is None:
+        with _managers_lock:
+            if _managers is None:
+                _managers = (WireGuardManager(), NetworkMonitor())
+    return _managers
+
+@ttl_cache(STATUS_CACHE_TTL)
+def cached_tunnel_status():
+    wg_manager, _ = get_managers()
+    return wg_manager.get_tunnel_status()
+
+@ttl_cache(STATUS_CACHE_TTL)
+def cached_current_stats():
+    _, network_monitor = get_managers()
+    return network_monitor.get_current_stats()
+
+@ttl_cache(CONFIG_CACHE_TTL)
+def cached_config():
+    wg_manager, _ = get_managers()
+    return wg_manager.get_config()
+
+# Cache-Control for polled endpoints, so browsers and proxies can coalesce bursts.
+# The history query string is part of the URL, so each `hours` value caches apart.
+_CACHE_CONTROL = {
+    'api_tunnel_status': 'public, max-age=1, stale-while-revalidate=5',
+    'api_stats_current': 'public, max-age=1, stale-while-revalidate=5',
+    'api_config': 'private, no-store',  # includes the local private key
+    'api_stats_history': 'public, max-age=30',
+    'api_logs': 'no-cache',  # Always revalidated against the ETag
+}
+
+def add_cache_headers(response):
+    """Attach Cache-Control to successful responses from polled endpoints"""
+    cache_control = _CACHE_CONTROL.get(request.endpoint)
+    if cache_control and response.status_code == 200:
+        response.headers['Cache-Control'] = cache_control
+    return response
 
-@app.route('/')
 def index():
     """Main dashboard page"""
-    tunnel_status = wg_manager.get_tunnel_status()
+    tunnel_status = cached_tunnel_status()
     return render_template('index.html', 
                            tunnel_status=tunnel_status,
-                           stats=network_monitor.get_current_stats())
+                           stats=cached_current_stats())
 
-@app.route('/stats')
 def stats():
     """Detailed statistics page"""
     return render_template('stats.html', 
-                           stats=network_monitor.get_current_stats(),
-                           tunnel_status=wg_manager.get_tunnel_status())
+                           stats=cached_current_stats(),
+                           tunnel_status=cached_tunnel_status())
 
-@app.route('/setup')
 def setup():
     """Configuration setup page"""
-    config = wg_manager.get_config()
+    config = cached_config()
     return render_template('setup.html', config=config)
 
-@app.route('/api/tunnel/status')
 def tunnel_status():
     """API endpoint to get tunnel status"""
-    return jsonify(wg_manager.get_tunnel_status())
+    return jsonify(cached_tunnel_status())
 
-@app.route('/api/tunnel/toggle', methods=['POST'])
 def toggle_tunnel():
     """API endpoint to start/stop the tunnel"""
-    data = request.json
-    action = data.get('action') if data else None
+    wg_manager, _ = get_managers()
+    body = request.get_json(silent=True) or {}
+    action = body.get('action') if isinstance(body, dict) else None
     
     if action == 'start':
         result = wg_manager.start_tunnel()
-        if result['success']:
-            flash('Tunnel started successfully', 'success')
-        else:
-            flash(f'Failed to start tunnel: {result["error"]}', 'danger')
+        cached_tunnel_status.cache_clear()
         return jsonify(result)
     
     elif action == 'stop':
         result = wg_manager.stop_tunnel()
-        if result['success']:
-            flash('Tunnel stopped successfully', 'success')
-        else:
-            flash(f'Failed to stop tunnel: {result["error"]}', 'danger')
+        cached_tunnel_status.cache_clear()
         return jsonify(result)
     
     return jsonify({'success': False, 'error': 'Invalid action'})
 
-@app.route('/api/config/update', methods=['POST'])
 def update_config():
     """API endpoint to update WireGuard configuration"""
-    config_data = request.json if request.json else {}
-    result = wg_manager.update_config(config_data)
+    wg_manager, _ = get_managers()
+    config_data = request.get_json(silent=True)
+    if not isinstance(config_data, dict):
+        return jsonify({'success': False, 'error': 'Expected a JSON object'}), 400
     
-    if result['success']:
-        flash('Configuration updated successfully', 'success')
-    else:
-        flash(f'Failed to update configuration: {result["error"]}', 'danger')
-        
+    result = wg_manager.update_config(config_data)
+    cached_config.cache_clear()
+    cached_tunnel_status.cache_clear()
     return jsonify(result)
 
-@app.route('/api/stats/current')
 def current_stats():
     """API endpoint to get current network statistics"""
-    return jsonify(network_monitor.get_current_stats())
+    return jsonify(cached_current_stats())
 
-@app.route('/api/stats/history')
 def stats_history():
     """API endpoint to get historical network statistics"""
     hours = request.args.get('hours', 1, type=int)
+    _, network_monitor = get_managers()
     return jsonify(network_monitor.get_stats_history(hours))
 
-@app.route('/terminal')
+def stats_stream():
+    """API endpoint streaming each monitoring cycle's stats as Server-Sent Events"""
+    _, network_monitor = get_managers()
+    dumps = current_app.json.dumps
+    
+    def events():
+        # Subscribed on the first read, so a response never started leaks nothing
+        snapshots = network_monitor.subscribe()
+        deadline = time.monotonic() + STATS_STREAM_MAX_AGE
+        try:
+            # Ask EventSource to reconnect promptly once the stream is closed
+            yield 'retry: 1000\n\n'
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return  # Bounded lifetime; the client reconnects
+                try:
+                    snapshot = snapshots.get(timeout=min(15, remaining))
+                except queue.Empty:
+                    # Comment line; lets a dropped client surface as a write error
+                    yield ': keepalive\n\n'
+                    continue
+                yield f'data: {dumps(snapshot)}\n\n'
+        finally:
+            network_monitor.unsubscribe(snapshots)
+    
+    return current_app.response_class(events(), mimetype='text/event-stream',
+                                      headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
 def terminal():
     """Terminal page for command line access"""
     return render_template('terminal.html')
 
-@app.route('/about')
 def about():
     """About page with project and author information"""
     return render_template('about.html')
 
-@app.route('/api/config')
 def get_config():
     """API endpoint to get the current configuration"""
-    return jsonify(wg_manager.get_config())
+    return jsonify(cached_config())
 
-@app.route('/api/config/generate_keypair')
 def generate_keypair():
     """API endpoint to generate a new WireGuard keypair"""
+    wg_manager, _ = get_managers()
     return jsonify(wg_manager.generate_keypair())
 
-@app.route('/api/config/reset', methods=['POST'])
 def reset_config():
     """API endpoint to reset configuration to defaults"""
+    wg_manager, _ = get_managers()
     try:
         wg_manager._create_default_settings()
         wg_manager._save_settings()
+        cached_config.cache_clear()
+        cached_tunnel_status.cache_clear()
         return jsonify({"success": True})
     except Exception as e:
         logger.error(f"Error resetting configuration: {e}")
         return jsonify({"success": False, "error": str(e)})
 
-@app.route('/api/network/ping')
+def ping_host_impl(host, count=PING_DEFAULT_COUNT):
+    """Ping a host and summarise latency and packet loss"""
+    # Probes go out every _PING_INTERVAL seconds; allow one more second for the last reply
+    timeout = count * _PING_INTERVAL + 1
+    try:
+        cmd = _PING_CMD_TEMPLATE.copy()
+        cmd += [str(count), host]
+        
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, env=_PING_ENV)
+        
+        # Kill ping at the deadline, which ends the read loop below with EOF
+        timer = threading.Timer(timeout, proc.kill)
+        timer.start()
+        
+        # Read replies as they arrive and stop as soon as every probe answered
+        latencies = []
+        try:
+            for line in proc.stdout:
+                match = _PING_TIME_RE.search(line)
+                if match:
+                    latencies.append(float(match.group(1)))
+                    if len(latencies) >= count:
+                        break
+        finally:
+            timer.cancel()
+            proc.kill()
+            proc.stdout.close()
+            proc.wait(timeout=1)
+        
+        if not latencies:
+            return {
+                'success': False,
+                'error': f"No replies from {host} within {timeout:g}s"
+            }
+        
+        packets_sent = count
+        packets_received = len(latencies)
+        
+        return {
+            'success': True,
+            'latency': sum(latencies) / packets_received,
+            'packet_loss': (packets_sent - packets_received) * 100 / packets_sent,
+            'packets_sent': packets_sent,
+            'packets_received': packets_received
+        }
+    
+    except Exception as e:
+        logger.error(f"Error pinging host {host}: {e}")
+        return {
+            'success': False,
+            'error': str(e)
+        }
+
 def ping_host():
     """API endpoint to ping a host"""
     host = request.args.get('host', '1.1.1.1')
+    count = request.args.get('count', PING_DEFAULT_COUNT, type=int)
+    count = min(max(count, 1), PING_MAX_COUNT)
+    
+    if not _HOST_RE.fullmatch(host):
+        return jsonify({'success': False, 'error': 'invalid host'}), 400
     
     try:
-        # Use network monitor's ping implementation
-        def ping_host_impl(host, count=10):
-            try:
-                # Run ping command
-                if os.name == 'nt':  # Windows
-                    cmd = ['ping', '-n', str(count), host]
-                else:  # Linux/Mac
-                    cmd = ['ping', '-c', str(count), host]
-                
-                import subprocess
-                result = subprocess.run(cmd, capture_output=True, text=True)
-                
-                if result.returncode == 0:
-                    output = result.stdout
-                    
-                    # Extract packet loss
-                    loss_match = None
-                    if os.name == 'nt':  # Windows
-                        loss_match = re.search(r'(\d+)% loss', output)
-                    else:  # Linux/Mac
-                        loss_match = re.search(r'(\d+)% packet loss', output)
-                    
-                    packet_loss = float(loss_match.group(1)) if loss_match else 0
-                    
-                    # Extract average latency
-                    latency_match = None
-                    if os.name == 'nt':  # Windows
-                        latency_match = re.search(r'Average = (\d+)ms', output)
-                    else:  # Linux/Mac
-                        latency_match = re.search(r'min/avg/max/.+ = [\d.]+/([\d.]+)/', output)
-                    
-                    latency = float(latency_match.group(1)) if latency_match else 0
-                    
-                    # Extract packet counts
-                    packets_sent = count
-                    packets_received = packets_sent - int(packets_sent * packet_loss / 100)
-                    
-                    return {
-                        'success': True,
-                        'latency': latency,
-                        'packet_loss': packet_loss,
-                        'packets_sent': packets_sent,
-                        'packets_received': packets_received
-                    }
-                
-                return {
-                    'success': False,
-                    'error': f"Ping failed with return code {result.returncode}"
-                }
-                
-            except Exception as e:
-                logger.error(f"Error pinging host {host}: {e}")
-                return {
-                    'success': False,
-                    'error': str(e)
-                }
-        
-        return jsonify(ping_host_impl(host))
+        return jsonify(ping_host_impl(host, count))
         
     except Exception as e:
         logger.error(f"Error in ping API: {e}")
@@ -198,55 +367,155 @@ def ping_host():
             'error': str(e)
         })
 
-@app.route('/api/network/speed-test')
-def api_speed_test():
-    """API endpoint to run a speed test"""
+# Speed tests take tens of seconds, so they run in the background and the
+# latest result is served from here
+_speedtest_state = {
+    'running': False,
+    'result': None,
+    'started': 0,
+    'job_id': 0,
+    'lock': threading.Lock()
+}
+
+def _collect_speed_test_result():
+    """Run a speed test and shape its result for the API"""
+    _, network_monitor = get_managers()
     try:
         # Run a speed test using the network monitor
         network_monitor._run_speed_test()
         
-        # Check if we have speed test results
-        if hasattr(network_monitor, 'speed_test_results'):
-            return jsonify({
+        # Check if we have speed test results (read once: the monitor's own
+        # hourly test may replace them from its worker thread)
+        results = getattr(network_monitor, 'speed_test_results', None)
+        if results is not None:
+            return {
                 'success': True,
-                'download': network_monitor.speed_test_results['download'],
-                'upload': network_monitor.speed_test_results['upload'],
-                'ping': network_monitor.speed_test_results['ping'],
-                'server': network_monitor.speed_test_results['server']
-            })
+                'download': results['download'],
+                'upload': results['upload'],
+                'ping': results['ping'],
+                'server': results['server']
+            }
         else:
             # Fall back to current stats
             stats = network_monitor.get_current_stats()
-            return jsonify({
+            return {
                 'success': True,
                 'download': stats['download_speed'],
                 'upload': stats['upload_speed'],
                 'ping': stats['latency'],
                 'server': 'Simulated from current stats'
-            })
+            }
             
     except Exception as e:
-        logger.error(f"Error in speed test API: {e}")
-        return jsonify({
+        logger.error(f"Error in speed test job: {e}")
+        return {
             'success': False,
             'error': str(e)
+        }
+
+def _speed_test_job():
+    """Background worker that stores the speed test result when done"""
+    result = _collect_speed_test_result()
+    with _speedtest_state['lock']:
+        _speedtest_state['result'] = result
+        _speedtest_state['running'] = False
+
+def api_speed_test():
+    """API endpoint to start a speed test in the background"""
+    with _speedtest_state['lock']:
+        # Join the run in progress rather than starting a second one
+        if not _speedtest_state['running']:
+            _speedtest_state['running'] = True
+            _speedtest_state['job_id'] += 1
+            _speedtest_state['started'] = time.time()
+            threading.Thread(target=_speed_test_job, daemon=True).start()
+        
+        return jsonify({
+            'success': True,
+            'job_id': _speedtest_state['job_id'],
+            'status': 'running'
         })
 
-@app.route('/api/logs')
+def api_speed_test_status():
+    """API endpoint to get the state of the latest speed test"""
+    with _speedtest_state['lock']:
+        if _speedtest_state['running']:
+            status = 'running'
+        elif _speedtest_state['result'] is not None:
+            status = 'done'
+        else:
+            status = 'idle'
+        
+        response = {
+            'success': True,
+            'job_id': _speedtest_state['job_id'],
+            'status': status,
+            'started': _speedtest_state['started']
+        }
+        
+        # Keep the last finished result visible while a new run is in progress
+        if _speedtest_state['result'] is not None:
+            response.update(_speedtest_state['result'])
+        
+        return jsonify(response)
+
+# Last tail read of the log file, keyed on (st_mtime_ns, st_size)
+_LOG_CACHE = {'key': None, 'value': None}
+
+def _tail_lines(path, count, window=64 * 1024, max_window=4 * 1024 * 1024):
+    """Return the last `count` lines of a file, reading only its tail"""
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        
+        while True:
+            start = max(0, size - window)
+            f.seek(start)
+            lines = f.read(size - start).splitlines(keepends=True)
+            
+            # Widen the window until it holds enough lines or covers the file
+            if start == 0 or len(lines) > count or window >= max_window:
+                break
+            window *= 2
+    
+    # The first line is cut off unless the window reached the start of the file
+    if start > 0:
+        lines = lines[1:]
+    
+    return [line.decode('utf-8', 'replace') for line in lines[-count:]]
+
 def get_logs():
     """API endpoint to get recent log entries"""
     try:
         # Create a simple log reader
         log_file = 'application.log'  # Default log file path
         
-        if os.path.exists(log_file):
-            with open(log_file, 'r') as f:
-                # Get the last 50 lines
-                lines = f.readlines()[-50:]
-                return jsonify({
-                    'success': True,
-                    'logs': lines
-                })
+        try:
+            st = os.stat(log_file)
+        except FileNotFoundError:
+            st = None
+        
+        if st is not None:
+            # Strong validator with nanosecond resolution, unlike HTTP dates,
+            # so lines written within the same second are never hidden
+            key = (st.st_mtime_ns, st.st_size)
+            etag = f'{st.st_mtime_ns:x}-{st.st_size:x}'
+            if request.if_none_match.contains(etag):
+                response = current_app.response_class(status=304)
+                response.set_etag(etag)
+                return response
+            
+            # Get the last 50 lines, re-reading only when the file has changed
+            if key != _LOG_CACHE['key']:
+                _LOG_CACHE['value'] = _tail_lines(log_file, 50)
+                _LOG_CACHE['key'] = key
+            
+            response = jsonify({
+                'success': True,
+                'logs': _LOG_CACHE['value']
+            })
+            response.set_etag(etag)
+            return response
         
         # If no log file, return console logs
         recent_logs = [
@@ -266,5 +535,46 @@ def get_logs():
             'error': str(e)
         })
 
+def create_app():
+    """Build the Flask app, register its routes and start the shared managers"""
+    app = Flask(__name__)
+    app.secret_key = os.environ.get("SESSION_SECRET", "default_secret_key_for_development")
+    if orjson is not None:
+        app.json = OrjsonProvider(app)
+    app.json.compact = True
+    
+    app.add_url_rule('/', 'page_index', index)
+    app.add_url_rule('/stats', 'page_stats', stats)
+    app.add_url_rule('/setup', 'page_setup', setup)
+    app.add_url_rule('/api/tunnel/status', 'api_tunnel_status', tunnel_status)
+    app.add_url_rule('/api/tunnel/toggle', 'api_tunnel_toggle', toggle_tunnel, methods=['POST'])
+    app.add_url_rule('/api/config/update', 'api_config_update', update_config, methods=['POST'])
+    app.add_url_rule('/api/stats/current', 'api_stats_current', current_stats)
+    app.add_url_rule('/api/stats/history', 'api_stats_history', stats_history)
+    app.add_url_rule('/api/stats/stream', 'api_stats_stream', stats_stream)
+    app.add_url_rule('/terminal', 'page_terminal', terminal)
+    app.add_url_rule('/about', 'page_about', about)
+    app.add_url_rule('/api/config', 'api_config', get_config)
+    app.add_url_rule('/api/config/generate_keypair', 'api_config_generate_keypair', generate_keypair)
+    app.add_url_rule('/api/config/reset', 'api_config_reset', reset_config, methods=['POST'])
+    app.add_url_rule('/api/network/ping', 'api_network_ping', ping_host)
+    app.add_url_rule('/api/network/speed-test', 'api_network_speed_test', api_speed_test, methods=['POST'])
+    app.add_url_rule('/api/network/speed-test/status', 'api_network_speed_test_status', api_speed_test_status)
+    app.add_url_rule('/api/logs', 'api_logs', get_logs)
+    app.after_request(add_cache_headers)
+    
+    # Start monitoring with the app rather than on the first request
+    get_managers()
+    return app
+
+def serve(app, host='0.0.0.0', port=5000, debug=False):
+    """Serve the app with gevent's WSGIServer, or the Flask dev server when debugging"""
+    if debug or WSGIServer is None:
+        app.run(host=host, port=port, debug=debug)
+        return
+    
+    logger.info(f"Serving with gevent WSGIServer on {host}:{port}")
+    WSGIServer((host, port), app).serve_forever()
+
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5000, debug=True)
+    serve(create_app(), host='0.0.0.0', port=5000, debug=os.environ.get('FLASK_DEBUG') == '1')
@@ -15,6 +15,13 @@ It provides a command-line interface to:
 Each function delegates to the appropriate specialized script in the /scripts directory.
 """
 
+# Patch the stdlib for cooperative I/O before any other import (no-op without gevent)
+try:
+    from gevent import monkey
+    monkey.patch_all()
+except ImportError:
+    pass
+
 import os
 import sys
 import argparse
@@ -23,29 +30,70 @@ import subprocess
 import importlib.util
 from pathlib import Path
 
-# For web interface
-from app import app
-
 # Configure logging
 logging.basicConfig(level=logging.INFO, 
                     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Scripts already imported by load_script, keyed by resolved path
+_MODULE_CACHE = {}
+
 def load_script(script_path):
-    """Dynamically import a Python script."""
+    """Dynamically import a Python script, once per resolved path."""
+    key = str(Path(script_path).resolve())
+    if key in _MODULE_CACHE:
+        return _MODULE_CACHE[key]
+    
     try:
         spec = importlib.util.spec_from_file_location("module.name", script_path)
         module = importlib.util.module_from_spec(spec)
         spec.loader.exec_module(module)
+        _MODULE_CACHE[key] = module
         return module
     except Exception as e:
         logger.error(f"Error loading script {script_path}: {e}")
         return None
 
-def run_web_interface(host="0.0.0.0", port=5000, debug=True):
-    """Start the web interface."""
+def run_script_main(script_path, args=None):
+    """Call a script's main() in-process, forwarding args through sys.argv."""
+    module = load_script(script_path)
+    if not module or not hasattr(module, 'main'):
+        raise RuntimeError(f"{script_path} does not define main()")
+    
+    saved_argv = sys.argv
+    sys.argv = [str(script_path)] + list(args or [])
+    try:
+        return module.main() == 0
+    finally:
+        sys.argv = saved_argv
+
+def run_web_interface(host="0.0.0.0", port=5000, debug=None):
+    """Start the web interface (debug mode defaults to FLASK_DEBUG=1)."""
+    if debug is None:
+        debug = os.environ.get("FLASK_DEBUG") == "1"
+    # Imported here so non-web commands never build the app or its managers
+    from app import serve
+    from wsgi import app
+    
     logger.info(f"Starting web interface on {host}:{port}")
-    app.run(host=host, port=port, debug=debug)
+    serve(app, host=host, port=port, debug=debug)
+
+def run_web_interface_prod(host="0.0.0.0", port=5000, workers=2):
+    """
+    Replace this process with gunicorn running gevent workers.
+    
+    gevent workers monkey-patch on startup; wsgi.py also patches as its first
+    import, so the stdlib is cooperative before the managers are created.
+    """
+    logger.info(f"Starting web interface under gunicorn on {host}:{port} with {workers} gevent workers")
+    os.execvp("gunicorn", [
+        "gunicorn",
+        "-k", "gevent",
+        "-w", str(workers),
+        "-b", f"{host}:{port}",
+        "--worker-connections", "1000",
+        "wsgi:app"
+    ])
 
 def run_ec2_setup(args=None):
     """Run the EC2 setup script."""
@@ -65,18 +113,9 @@ def run_ec2_setup(args=None):
         logger.error("Please set these variables in .env file or environment")
         return False
     
-    # Either run as module or call main function directly
+    # Call the script's main function in this interpreter
     try:
-        ec2_module = load_script(script_path)
-        if ec2_module and hasattr(ec2_module, 'main'):
-            return ec2_module.main() == 0
-        else:
-            # Fallback to subprocess
-            cmd = [sys.executable, str(script_path)]
-            if args:
-                cmd.extend(args)
-            result = subprocess.run(cmd)
-            return result.returncode == 0
+        return run_script_main(script_path, args)
     except Exception as e:
         logger.error(f"Error running EC2 setup: {e}")
         return False
@@ -108,16 +147,7 @@ def run_wireguard_setup(args=None):
     
     # Run the script
     try:
-        wg_module = load_script(script_path)
-        if wg_module and hasattr(wg_module, 'main'):
-            return wg_module.main() == 0
-        else:
-            # Fallback to subprocess
-            cmd = [sys.executable, str(script_path)]
-            if args:
-                cmd.extend(args)
-            result = subprocess.run(cmd)
-            return result.returncode == 0
+        return run_script_main(script_path, args)
     except Exception as e:
         logger.error(f"Error running WireGuard setup: {e}")
         return False
@@ -222,14 +252,7 @@ def run_tests():
     
     # Run the test script
     try:
-        test_module = load_script(test_path)
-        if test_module and hasattr(test_module, 'main'):
-            return test_module.main() == 0
-        else:
-            # Fallback to subprocess
-            cmd = [sys.executable, str(test_path)]
-            result = subprocess.run(cmd)
-            return result.returncode == 0
+        return run_script_main(test_path)
     except Exception as e:
         logger.error(f"Error running tests: {e}")
         return False
@@ -243,7 +266,9 @@ def main():
     web_parser = subparsers.add_parser("web", help="Start the web interface")
     web_parser.add_argument("--host", default="0.0.0.0", help="Host to bind to")
     web_parser.add_argument("--port", type=int, default=5000, help="Port to bind to")
-    web_parser.add_argument("--no-debug", action="store_true", help="Disable debug mode")
+    web_parser.add_argument("--debug", action="store_true", help="Enable debug mode (also enabled by FLASK_DEBUG=1)")
+    web_parser.add_argument("--prod", action="store_true", help="Serve with gunicorn and gevent workers")
+    web_parser.add_argument("--workers", type=int, default=2, help="Number of gunicorn workers (with --prod)")
     
     # EC2 setup command
     subparsers.add_parser("setup-ec2", help="Set up AWS EC2 instance")
@@ -291,7 +316,10 @@ def main():
     
     # Run the appropriate command
     if args.command == "web":
-        run_web_interface(host=args.host, port=args.port, debug=not args.no_debug)
+        if args.prod:
+            run_web_interface_prod(host=args.host, port=args.port, workers=args.workers)
+        else:
+            run_web_interface(host=args.host, port=args.port, debug=args.debug or None)
     elif args.command == "setup-ec2":
         if not run_ec2_setup():
             return 1
@@ -0,0 +1,82 @@
+# cython: language_level=3
+"""
+Compiled metric kernel for deployments without numba.
+
+Mirrors the kernel built by `network_optimization.make_kernel`, with the
+score weights and normalization targets passed as trailing arguments.
+Build in place with:
+
+    cythonize -i models/_metrics_kernel.pyx
+"""
+cimport cython
+from libc.math cimport exp
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.cdivision(True)
+cpdef tuple metrics_kernel(double b_local, double l_propagation, double mtu, double buffer_size,
+                           double packet_size, double congestion_level, double utilization,
+                           double queue_length, double log_utilization, double service_ms_per_bit,
+                           double congestion_loss_bias, double w_throughput=0.5, double w_latency=0.3,
+                           double w_loss=0.2, double target_throughput=0.0015,
+                           double target_latency=150.0, double target_loss=0.01):
+    cdef double service_time_ms, queueing_delay, processing_delay, transmission_delay
+    cdef double total_latency, effective_buffer, packet_loss, effective_throughput
+    cdef double throughput_score, latency_score, loss_score, score
+
+    # C division does not raise; keep the pure-Python kernel's error on an idle link
+    if b_local == 0.0:
+        raise ZeroDivisionError("float division by zero")
+
+    # Calculate queueing delay (ms)
+    service_time_ms = packet_size * 8 * service_ms_per_bit
+    queueing_delay = queue_length * service_time_ms
+
+    # Calculate processing delay (network header processing)
+    processing_delay = 1.0  # Assume 1ms for processing overhead
+
+    # Calculate transmission delay (time to put packet on the link)
+    transmission_delay = (mtu * 8) / (b_local * 1e9) * 1000  # Convert to ms
+
+    # Total latency = propagation + queueing + processing + transmission
+    total_latency = l_propagation + queueing_delay + processing_delay + transmission_delay
+
+    # P_loss = ρ^K (for a buffer of size K), as in the M/M/1/K queue
+    effective_buffer = buffer_size * (1 - congestion_level)
+
+    if effective_buffer <= 0:
+        packet_loss = 1.0
+    elif utilization <= 0.0:
+        packet_loss = 0.0  # Idle link: ρ^K = 0, no log/exp needed
+    elif utilization < 1.0:
+        packet_loss = exp(effective_buffer * log_utilization) * (1 - utilization)
+    else:
+        packet_loss = 0.5  # High congestion, significant packet loss
+
+    # Add effect of network congestion to packet loss
+    packet_loss = packet_loss + congestion_loss_bias
+    packet_loss = 0.0 if packet_loss < 0.0 else (1.0 if packet_loss > 1.0 else packet_loss)  # Clamp to [0, 100%]
+
+    # Calculate effective throughput (considering packet loss)
+    effective_throughput = b_local * (1 - packet_loss)
+
+    # Calculate overall performance score
+    throughput_score = effective_throughput / target_throughput
+    throughput_score = throughput_score if throughput_score < 1.0 else 1.0
+    latency_score = 1 - (total_latency / target_latency)
+    latency_score = latency_score if latency_score > 0.0 else 0.0
+    loss_score = 1 - (packet_loss / target_loss)
+
+    score = (
+        w_throughput * throughput_score +
+        w_latency * latency_score +
+        w_loss * loss_score
+    )
+
+    # Clip values to valid ranges (packet_loss was already clamped above)
+    total_latency = total_latency if total_latency > l_propagation else l_propagation
+    effective_throughput = (b_local if effective_throughput > b_local else
+                            (0.0 if effective_throughput < 0.0 else effective_throughput))
+
+    return effective_throughput, total_latency, packet_loss, queue_length, utilization, score
@@ -23,14 +23,42 @@ Constraints:
 """
 
 import logging
+import functools
 import numpy as np
 import math
+from collections import deque, namedtuple
+from types import MappingProxyType
 from dataclasses import dataclass
-from typing import Dict, Tuple, List, Optional
+from typing import Dict, Tuple, List, Optional, Union
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    prange = range
+    
+    def njit(*args, **kwargs):
+        """Stand-in for numba.njit that leaves the function as plain Python"""
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+# Without numba, prefer the Cython build of the scalar kernel when one has been compiled
+_compiled_metrics_kernel = None
+if not NUMBA_AVAILABLE:
+    try:
+        from models._metrics_kernel import metrics_kernel as _compiled_metrics_kernel
+    except ImportError:
+        pass
+
+# Grids at least this large are evaluated by the multi-threaded numba kernel;
+# below it, thread start-up costs more than the NumPy pass
+PARALLEL_GRID_MIN_POINTS = 10000
 
 logger = logging.getLogger(__name__)
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class NetworkParameters:
     """Parameters describing the network conditions"""
     b_local: float = 0.0015  # Local ISP bandwidth in Gbps (1.5 Mbps)
@@ -41,7 +69,7 @@ class NetworkParameters:
     packet_size: int = 1400  # Average packet size in bytes
     congestion_level: float = 0.0  # Network congestion level (0.0-1.0)
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class NetworkMetrics:
     """Calculated network performance metrics"""
     effective_throughput: float = 0.0  # Effective throughput in Gbps
@@ -52,115 +80,396 @@ class NetworkMetrics:
     score: float = 0.0                 # Overall performance score
 
 
-class NetworkOptimizer:
+# Terms that depend only on bandwidth and congestion, shared by every MTU/buffer
+# combination evaluated against the same link
+_InvariantCache = namedtuple('_InvariantCache', [
+    'utilization',          # M/M/1 utilization ρ (independent of packet size)
+    'queue_length',         # M/M/1 queue length ρ / (1 - ρ)
+    'log_utilization',      # log(ρ), so ρ^K is a single exp per buffer size
+    'service_ms_per_bit',   # EC2 service time per bit; times packet bits gives service time in ms
+    'congestion_loss_bias'  # Packet loss added by network congestion
+])
+
+
+# Columns of NetworkOptimizer.evaluated_configs
+_EVALUATED_FIELDS = (
+    'mtu', 'buffer_size', 'packet_size',
+    'effective_throughput', 'total_latency', 'packet_loss', 'queue_length', 'utilization', 'score'
+)
+
+
+@njit(cache=True)
+def _invariant_kernel(b_local, b_ec2, congestion_level):
     """
-    Implements the mathematical model combining network flow theory and
-    queueing theory for optimal VPN tunnel parameter selection.
+    Compute the `_InvariantCache` fields for a link.
+    
+    Returns:
+        (utilization, queue_length, log_utilization, service_ms_per_bit, congestion_loss_bias)
     """
-    def __init__(self, initial_params: Optional[NetworkParameters] = None):
-        """
-        Initialize the network optimizer with parameters.
-        
-        Args:
-            initial_params: Initial network parameters
-        """
-        self.params = initial_params if initial_params else NetworkParameters()
-        self.weights = {
-            'throughput': 0.5,  # Weight for throughput in the optimization score
-            'latency': 0.3,     # Weight for latency in the optimization score
-            'loss': 0.2         # Weight for packet loss in the optimization score
-        }
-        
-        # Constraints
-        self.constraints = {
-            'max_packet_loss': 0.01,  # Maximum acceptable packet loss (1%)
-            'min_throughput': 0.0005, # Minimum acceptable throughput in Gbps (0.5 Mbps)
-            'max_latency': 150.0      # Maximum acceptable latency in ms
-        }
+    # M/M/1 utilization λ/μ; the packet size cancels out of the rate ratio
+    utilization = (b_local * 1e9) / (b_ec2 * 1e9)
+    
+    # Ensure utilization is < 1 for stability
+    if utilization >= 1.0:
+        utilization = 0.99  # Cap at high value to avoid infinity
         
-        # Record of evaluated configurations
-        self.evaluated_configs: List[Tuple[NetworkParameters, NetworkMetrics]] = []
+    # Calculate queue length using M/M/1 formula: ρ / (1 - ρ)
+    queue_length = utilization / (1 - utilization)
+    
+    # ρ^K = exp(K log ρ), avoiding pow(); ρ <= 0 is special-cased in the kernel
+    log_utilization = math.log(utilization) if utilization > 0 else -math.inf
+    
+    # Service time (ms) of one bit on the EC2 link
+    service_ms_per_bit = 1000.0 / (b_ec2 * 1e9)
+    
+    # Effect of network congestion on packet loss
+    congestion_loss_bias = (congestion_level * congestion_level) * 0.1
+    
+    return utilization, queue_length, log_utilization, service_ms_per_bit, congestion_loss_bias
 
-    def calculate_metrics(self, params: NetworkParameters) -> NetworkMetrics:
-        """
-        Calculate network performance metrics based on the given parameters.
-        
-        Args:
-            params: Network parameters to evaluate
-            
-        Returns:
-            NetworkMetrics: Calculated performance metrics
-        """
-        # Convert bandwidth from Gbps to packets per second
-        packet_size_bits = params.packet_size * 8
-        
-        # Arrival rate (λ) in packets per second
-        arrival_rate = (params.b_local * 1e9) / packet_size_bits
-        
-        # Service rate (μ) in packets per second
-        service_rate = (params.b_ec2 * 1e9) / packet_size_bits
-        
-        # M/M/1 Queue calculations
-        utilization = arrival_rate / service_rate
-        
-        # Ensure utilization is < 1 for stability
-        if utilization >= 1.0:
-            utilization = 0.99  # Cap at high value to avoid infinity
-            
-        # Calculate queue length using M/M/1 formula: ρ / (1 - ρ)
-        queue_length = utilization / (1 - utilization)
+
+@functools.lru_cache(maxsize=None)
+def make_kernel(w_throughput=0.5, w_latency=0.3, w_loss=0.2,
+                target_throughput=0.0015, target_latency=150.0, target_loss=0.01):
+    """
+    Build the scalar metric kernel for one set of score weights and targets.
+    
+    The weights and normalization targets are captured by the closure, so numba
+    compiles them in as constants. Kernels are memoized per argument set, and
+    numba's cache keeps each specialization across runs.
+    
+    Args:
+        w_throughput, w_latency, w_loss: Score weights
+        target_throughput: Throughput (Gbps) that earns a full throughput score
+        target_latency: Latency (ms) at which the latency score reaches zero
+        target_loss: Packet loss at which the loss score reaches zero
         
+    Returns:
+        Kernel taking (b_local, l_propagation, mtu, buffer_size, packet_size,
+        congestion_level, *_InvariantCache) and returning (effective_throughput,
+        total_latency, packet_loss, queue_length, utilization, score)
+    """
+    if _compiled_metrics_kernel is not None:
+        return functools.partial(
+            _compiled_metrics_kernel,
+            w_throughput=w_throughput, w_latency=w_latency, w_loss=w_loss,
+            target_throughput=target_throughput, target_latency=target_latency, target_loss=target_loss
+        )
+    
+    @njit(cache=True)
+    def metrics_kernel(b_local, l_propagation, mtu, buffer_size, packet_size, congestion_level,
+                       utilization, queue_length, log_utilization, service_ms_per_bit, congestion_loss_bias):
         # Calculate queueing delay (ms)
-        service_time_ms = 1000.0 / service_rate  # Convert seconds to ms
+        service_time_ms = packet_size * 8 * service_ms_per_bit
         queueing_delay = queue_length * service_time_ms
         
         # Calculate processing delay (network header processing)
         processing_delay = 1.0  # Assume 1ms for processing overhead
         
         # Calculate transmission delay (time to put packet on the link)
-        transmission_delay = (params.mtu * 8) / (params.b_local * 1e9) * 1000  # Convert to ms
+        transmission_delay = (mtu * 8) / (b_local * 1e9) * 1000  # Convert to ms
         
         # Total latency = propagation + queueing + processing + transmission
-        total_latency = params.l_propagation + queueing_delay + processing_delay + transmission_delay
+        total_latency = l_propagation + queueing_delay + processing_delay + transmission_delay
         
         # Calculate packet loss probability based on congestion level and buffer size
         # Using a modified form of the buffer overflow probability in M/M/1/K queue
         # P_loss = ρ^K (for a buffer of size K)
-        effective_buffer = params.buffer_size * (1 - params.congestion_level)
+        effective_buffer = buffer_size * (1 - congestion_level)
         
         # Avoid division by zero if buffer is full
         if effective_buffer <= 0:
             packet_loss = 1.0
         else:
-            if utilization < 1.0:
-                packet_loss = (utilization ** effective_buffer) * (1 - utilization)
+            if utilization <= 0.0:
+                packet_loss = 0.0  # Idle link: ρ^K = 0, no log/exp needed
+            elif utilization < 1.0:
+                packet_loss = math.exp(effective_buffer * log_utilization) * (1 - utilization)
             else:
                 packet_loss = 0.5  # High congestion, significant packet loss
                 
         # Add effect of network congestion to packet loss
-        packet_loss = packet_loss + (params.congestion_level ** 2) * 0.1
-        packet_loss = min(packet_loss, 1.0)  # Cap at 100%
+        packet_loss = packet_loss + congestion_loss_bias
+        packet_loss = 0.0 if packet_loss < 0.0 else (1.0 if packet_loss > 1.0 else packet_loss)  # Clamp to [0, 100%]
         
         # Calculate effective throughput (considering packet loss)
-        effective_throughput = params.b_local * (1 - packet_loss)
+        effective_throughput = b_local * (1 - packet_loss)
         
         # Calculate overall performance score
         # Higher throughput is better, lower latency and packet loss are better
-        throughput_score = min(effective_throughput / 0.0015, 1.0)  # Normalized to 1.5 Mbps
-        latency_score = max(0, 1 - (total_latency / 150.0))  # Normalized to 150ms
-        loss_score = 1 - (packet_loss / 0.01)  # Normalized to 1% target
+        throughput_score = effective_throughput / target_throughput  # Normalized to 1.5 Mbps by default
+        throughput_score = throughput_score if throughput_score < 1.0 else 1.0
+        latency_score = 1 - (total_latency / target_latency)  # Normalized to 150ms by default
+        latency_score = latency_score if latency_score > 0.0 else 0.0
+        loss_score = 1 - (packet_loss / target_loss)  # Normalized to 1% target by default
         
         # Combined weighted score (0.0-1.0)
         score = (
-            self.weights['throughput'] * throughput_score +
-            self.weights['latency'] * latency_score +
-            self.weights['loss'] * loss_score
+            w_throughput * throughput_score +
+            w_latency * latency_score +
+            w_loss * loss_score
+        )
+        
+        # Clip values to valid ranges (packet_loss was already clamped above)
+        total_latency = total_latency if total_latency > l_propagation else l_propagation
+        effective_throughput = (b_local if effective_throughput > b_local else
+                                (0.0 if effective_throughput < 0.0 else effective_throughput))
+        
+        return effective_throughput, total_latency, packet_loss, queue_length, utilization, score
+    
+    return metrics_kernel
+
+
+@functools.lru_cache(maxsize=None)
+def make_grid_kernel(metrics_kernel):
+    """
+    Build a parallel grid evaluator around a kernel from `make_kernel`.
+    
+    The returned function takes (mtu_arr, buf_arr, b_local, l_propagation,
+    congestion_level, *_InvariantCache) and returns an array of shape
+    (len(mtu_arr) * len(buf_arr), 7) in row-major grid order, with columns
+    (packet_size, effective_throughput, total_latency, packet_loss,
+    queue_length, utilization, score).
+    """
+    @njit(parallel=True, nogil=True, cache=True)
+    def grid_kernel(mtu_arr, buf_arr, b_local, l_propagation, congestion_level,
+                    utilization, queue_length, log_utilization, service_ms_per_bit, congestion_loss_bias):
+        n_buf = buf_arr.shape[0]
+        n_points = mtu_arr.shape[0] * n_buf
+        out = np.empty((n_points, 7))
+        for k in prange(n_points):
+            mtu = mtu_arr[k // n_buf]
+            packet_size = mtu - 20.0 if mtu - 20.0 < 1400.0 else 1400.0
+            result = metrics_kernel(b_local, l_propagation, mtu, buf_arr[k % n_buf], packet_size,
+                                    congestion_level, utilization, queue_length, log_utilization,
+                                    service_ms_per_bit, congestion_loss_bias)
+            out[k, 0] = packet_size
+            for c in range(6):
+                out[k, c + 1] = result[c]
+        return out
+    
+    return grid_kernel
+
+
+@functools.lru_cache(maxsize=256)
+def _cached_metrics(metrics_kernel, b_local, b_ec2, l_propagation, mtu, buffer_size, packet_size,
+                    congestion_level):
+    """Memoized `metrics_kernel` call for configurations evaluated without a shared cache"""
+    invariants = _invariant_kernel(b_local, b_ec2, congestion_level)
+    return metrics_kernel(b_local, l_propagation, mtu, buffer_size, packet_size, congestion_level,
+                          *invariants)
+
+
+class RollingMetrics:
+    """
+    Fixed-size window of recent NetworkMetrics.
+    
+    Running sums of packet loss and latency are updated as samples enter and
+    leave the window, so the averages cost O(1) instead of a pass over it.
+    """
+    def __init__(self, maxlen: int = 100):
+        """
+        Initialize an empty window.
+        
+        Args:
+            maxlen: Number of most recent samples to keep
+        """
+        if maxlen < 1:
+            raise ValueError("maxlen must be at least 1")
+        self._window = deque(maxlen=maxlen)
+        self.sum_loss = 0.0
+        self.sum_latency = 0.0
+
+    def append(self, metrics: NetworkMetrics):
+        """Add a sample, evicting the oldest one if the window is full."""
+        if len(self._window) == self._window.maxlen:
+            oldest = self._window.popleft()
+            self.sum_loss -= oldest.packet_loss
+            self.sum_latency -= oldest.total_latency
+        self._window.append(metrics)
+        self.sum_loss += metrics.packet_loss
+        self.sum_latency += metrics.total_latency
+
+    def avg_loss(self) -> float:
+        """Average packet loss over the window."""
+        return self.sum_loss / len(self._window)
+
+    def avg_latency(self) -> float:
+        """Average total latency (ms) over the window."""
+        return self.sum_latency / len(self._window)
+
+    def __len__(self) -> int:
+        return len(self._window)
+
+    def __iter__(self):
+        return iter(self._window)
+
+
+class NetworkMetricsArray:
+    """
+    Columnar ring buffer of NetworkMetrics samples.
+    
+    Each metric is stored in its own preallocated float64 array, so window
+    statistics are single NumPy reductions over contiguous memory. Once
+    `capacity` samples are stored, new samples overwrite the oldest.
+    """
+    fields = ('effective_throughput', 'total_latency', 'packet_loss', 'queue_length', 'utilization', 'score')
+
+    def __init__(self, capacity: int = 1000):
+        """
+        Initialize an empty buffer.
+        
+        Args:
+            capacity: Number of most recent samples to keep
+        """
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self._columns = {field: np.empty(capacity) for field in self.fields}
+        self._size = 0
+        self._next = 0
+
+    def append(self, metrics: NetworkMetrics):
+        """Store a sample, overwriting the oldest one if the buffer is full."""
+        for field, column in self._columns.items():
+            column[self._next] = getattr(metrics, field)
+        self._next = (self._next + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+    def __getitem__(self, field: str) -> np.ndarray:
+        """Stored values of one metric, in storage (not arrival) order."""
+        return self._columns[field][:self._size]
+
+    def __len__(self) -> int:
+        return self._size
+
+
+class NetworkOptimizer:
+    """
+    Implements the mathematical model combining network flow theory and
+    queueing theory for optimal VPN tunnel parameter selection.
+    """
+    def __init__(self, initial_params: Optional[NetworkParameters] = None):
+        """
+        Initialize the network optimizer with parameters.
+        
+        Args:
+            initial_params: Initial network parameters
+        """
+        self.params = initial_params if initial_params else NetworkParameters()
+        self._w_tp = 0.5    # Weight for throughput in the optimization score
+        self._w_lat = 0.3   # Weight for latency in the optimization score
+        self._w_loss = 0.2  # Weight for packet loss in the optimization score
+        
+        # Normalization targets of the optimization score (see `make_kernel`)
+        self._target_tp = 0.0015   # Throughput (Gbps) earning a full throughput score
+        self._target_lat = 150.0   # Latency (ms) at which the latency score reaches zero
+        self._target_loss = 0.01   # Packet loss at which the loss score reaches zero
+        
+        # Constraints
+        self.constraints = {
+            'max_packet_loss': 0.01,  # Maximum acceptable packet loss (1%)
+            'min_throughput': 0.0005, # Minimum acceptable throughput in Gbps (0.5 Mbps)
+            'max_latency': 150.0      # Maximum acceptable latency in ms
+        }
+        
+        # Record of evaluated configurations, one preallocated array per field
+        # (grid points in evaluation order); see `evaluated_configs`
+        self._evaluated: Dict[str, np.ndarray] = {
+            field: np.empty(64) for field in _EVALUATED_FIELDS
+        }
+        self._n_evaluated = 0
+
+    @property
+    def evaluated_configs(self) -> Dict[str, np.ndarray]:
+        """Evaluated configurations so far, as a view of one array per field."""
+        return {field: column[:self._n_evaluated] for field, column in self._evaluated.items()}
+
+    def _record_evaluated(self, grid: Dict[str, np.ndarray]):
+        """Append a grid's points to the record, growing its storage geometrically."""
+        start = self._n_evaluated
+        end = start + grid['score'].size
+        capacity = len(self._evaluated['score'])
+        if end > capacity:
+            capacity = max(end, 2 * capacity)
+            for field, column in self._evaluated.items():
+                grown = np.empty(capacity)
+                grown[:start] = column[:start]
+                self._evaluated[field] = grown
+        for field, column in self._evaluated.items():
+            column[start:end] = grid[field].ravel()
+        self._n_evaluated = end
+
+    @property
+    def weights(self) -> MappingProxyType:
+        """Score weights by component, as a read-only mapping."""
+        return MappingProxyType({'throughput': self._w_tp, 'latency': self._w_lat, 'loss': self._w_loss})
+
+    def _kernel(self):
+        """Metric kernel for this optimizer's score weights and targets."""
+        return make_kernel(self._w_tp, self._w_lat, self._w_loss,
+                           self._target_tp, self._target_lat, self._target_loss)
+
+    def _score(self, effective_throughput, total_latency, packet_loss):
+        """
+        Vectorized form of the score computed by `make_kernel`'s kernels.
+        
+        Uses the same weights and targets as `_kernel`, so the NumPy paths
+        rank configurations exactly as the compiled ones do.
+        """
+        throughput_score = np.minimum(effective_throughput / self._target_tp, 1.0)
+        latency_score = np.maximum(0, 1 - (total_latency / self._target_lat))
+        loss_score = 1 - (packet_loss / self._target_loss)
+        return (
+            self._w_tp * throughput_score +
+            self._w_lat * latency_score +
+            self._w_loss * loss_score
         )
+
+    def _invariants(self, params: NetworkParameters) -> _InvariantCache:
+        """
+        Precompute the terms shared by every configuration on the same link.
+        
+        Args:
+            params: Network parameters supplying bandwidth and congestion
+            
+        Returns:
+            _InvariantCache: Link-level terms for `calculate_metrics`
+        """
+        return _InvariantCache(*_invariant_kernel(
+            float(params.b_local), float(params.b_ec2), float(params.congestion_level)
+        ))
+
+    def calculate_metrics(self, params: NetworkParameters,
+                          cache: Optional[_InvariantCache] = None) -> NetworkMetrics:
+        """
+        Calculate network performance metrics based on the given parameters.
+        
+        Args:
+            params: Network parameters to evaluate
+            cache: Precomputed link-level terms for `params`, from `_invariants`
+            
+        Returns:
+            NetworkMetrics: Calculated performance metrics
+        """
+        kernel = self._kernel()
+        
+        if cache is None:
+            # Repeated configurations (current params, upgrade what-ifs) hit the memo
+            results = _cached_metrics(
+                kernel, float(params.b_local), float(params.b_ec2), float(params.l_propagation),
+                float(params.mtu), float(params.buffer_size), float(params.packet_size),
+                float(params.congestion_level)
+            )
+        else:
+            results = kernel(
+                float(params.b_local), float(params.l_propagation),
+                float(params.mtu), float(params.buffer_size), float(params.packet_size),
+                float(params.congestion_level), *cache
+            )
         
-        # Clip values to valid ranges
-        packet_loss = min(max(packet_loss, 0.0), 1.0)
-        total_latency = max(total_latency, params.l_propagation)
-        effective_throughput = min(max(effective_throughput, 0.0), params.b_local)
+        (effective_throughput, total_latency, packet_loss,
+         queue_length, utilization, score) = results
         
         return NetworkMetrics(
             effective_throughput=effective_throughput,
@@ -171,54 +480,215 @@ class NetworkOptimizer:
             score=score
         )
 
-    def optimize_parameters(self) -> Tuple[NetworkParameters, NetworkMetrics]:
+    def _calculate_metrics_vec(self, mtu_arr: np.ndarray, buf_arr: np.ndarray,
+                               params: NetworkParameters,
+                               cache: Optional[_InvariantCache] = None) -> Dict[str, np.ndarray]:
+        """
+        Vectorized `calculate_metrics` over a grid of MTU and buffer sizes.
+        
+        The remaining fields of `params` are shared by every grid point. Each
+        returned array has shape (len(mtu_arr), len(buf_arr)).
+        
+        Args:
+            mtu_arr: 1-D array of MTU values in bytes
+            buf_arr: 1-D array of buffer sizes in packets
+            params: Network parameters supplying bandwidth, latency and congestion
+            cache: Precomputed link-level terms for `params`, from `_invariants`
+            
+        Returns:
+            Dict mapping NetworkMetrics field names (plus 'packet_size') to arrays
+        """
+        if cache is None:
+            cache = self._invariants(params)
+        utilization, queue_length = cache.utilization, cache.queue_length
+        
+        mtu = np.asarray(mtu_arr, dtype=np.float64)[:, None]
+        buf = np.asarray(buf_arr, dtype=np.float64)[None, :]
+        
+        # Latency depends on the MTU only (axis 0)
+        packet_size = np.minimum(mtu - 20, 1400)
+        queueing_delay = queue_length * (packet_size * 8 * cache.service_ms_per_bit)
+        processing_delay = 1.0
+        transmission_delay = (mtu * 8) / (params.b_local * 1e9) * 1000
+        total_latency = params.l_propagation + queueing_delay + processing_delay + transmission_delay
+        
+        # Packet loss depends on the buffer size only (axis 1)
+        effective_buffer = buf * (1 - params.congestion_level)
+        if utilization < 1.0:
+            with np.errstate(over='ignore', under='ignore', invalid='ignore'):
+                overflow = np.exp(effective_buffer * cache.log_utilization) * (1 - utilization)
+        else:
+            overflow = np.full(effective_buffer.shape, 0.5)
+        packet_loss = np.where(effective_buffer <= 0, 1.0, overflow)
+        packet_loss = np.minimum(packet_loss + cache.congestion_loss_bias, 1.0)
+        
+        effective_throughput = params.b_local * (1 - packet_loss)
+        
+        score = self._score(effective_throughput, total_latency, packet_loss)
+        
+        shape = score.shape
+        return {
+            'packet_size': np.broadcast_to(packet_size, shape),
+            'effective_throughput': np.broadcast_to(np.clip(effective_throughput, 0.0, params.b_local), shape),
+            'total_latency': np.broadcast_to(np.maximum(total_latency, params.l_propagation), shape),
+            'packet_loss': np.broadcast_to(np.clip(packet_loss, 0.0, 1.0), shape),
+            'queue_length': np.full(shape, queue_length),
+            'utilization': np.full(shape, utilization),
+            'score': score
+        }
+
+    def _calculate_metrics_bandwidths(self, b_local_arr: np.ndarray,
+                                      params: NetworkParameters) -> Dict[str, np.ndarray]:
+        """
+        Vectorized `calculate_metrics` over candidate local bandwidths.
+        
+        Every other field comes from `params`. The link-level terms vary with
+        the bandwidth here, so they are computed per element rather than cached.
+        
+        Args:
+            b_local_arr: 1-D array of local ISP bandwidths in Gbps
+            params: Network parameters supplying the remaining fields
+            
+        Returns:
+            Dict mapping NetworkMetrics field names to 1-D arrays
+        """
+        b_local = np.asarray(b_local_arr, dtype=np.float64)
+        
+        utilization = (b_local * 1e9) / (params.b_ec2 * 1e9)
+        utilization = np.where(utilization >= 1.0, 0.99, utilization)
+        queue_length = utilization / (1 - utilization)
+        with np.errstate(divide='ignore'):
+            log_utilization = np.where(utilization > 0, np.log(np.maximum(utilization, 0)), -np.inf)
+        
+        service_time_ms = params.packet_size * 8 * (1000.0 / (params.b_ec2 * 1e9))
+        processing_delay = 1.0
+        transmission_delay = (params.mtu * 8) / (b_local * 1e9) * 1000
+        total_latency = params.l_propagation + queue_length * service_time_ms + processing_delay + transmission_delay
+        
+        effective_buffer = params.buffer_size * (1 - params.congestion_level)
+        if effective_buffer <= 0:
+            packet_loss = np.ones_like(b_local)
+        else:
+            with np.errstate(over='ignore', under='ignore', invalid='ignore'):
+                packet_loss = np.where(utilization < 1.0,
+                                       np.exp(effective_buffer * log_utilization) * (1 - utilization), 0.5)
+        packet_loss = np.minimum(packet_loss + (params.congestion_level ** 2) * 0.1, 1.0)
+        
+        effective_throughput = b_local * (1 - packet_loss)
+        
+        score = self._score(effective_throughput, total_latency, packet_loss)
+        
+        return {
+            'effective_throughput': np.clip(effective_throughput, 0.0, b_local),
+            'total_latency': np.maximum(total_latency, params.l_propagation),
+            'packet_loss': np.clip(packet_loss, 0.0, 1.0),
+            'queue_length': queue_length,
+            'utilization': utilization,
+            'score': score
+        }
+
+    def _calculate_metrics_grid(self, mtu_arr: np.ndarray, buf_arr: np.ndarray,
+                                params: NetworkParameters,
+                                cache: Optional[_InvariantCache] = None) -> Dict[str, np.ndarray]:
+        """
+        Evaluate a grid with the parallel numba kernel when it is large enough,
+        otherwise with `_calculate_metrics_vec`. Returns the same dict either way.
+        """
+        if not NUMBA_AVAILABLE or len(mtu_arr) * len(buf_arr) < PARALLEL_GRID_MIN_POINTS:
+            return self._calculate_metrics_vec(mtu_arr, buf_arr, params, cache)
+        
+        if cache is None:
+            cache = self._invariants(params)
+        grid_kernel = make_grid_kernel(self._kernel())
+        out = grid_kernel(
+            np.asarray(mtu_arr, dtype=np.float64), np.asarray(buf_arr, dtype=np.float64),
+            float(params.b_local), float(params.l_propagation), float(params.congestion_level),
+            *cache
+        )
+        
+        shape = (len(mtu_arr), len(buf_arr))
+        columns = ('packet_size',) + _EVALUATED_FIELDS[3:]
+        return {field: out[:, c].reshape(shape) for c, field in enumerate(columns)}
+
+    def optimize_parameters(self, baseline_metrics: Optional[NetworkMetrics] = None,
+                            mtu_values: Optional[List[int]] = None,
+                            buffer_sizes: Optional[List[int]] = None
+                            ) -> Tuple[NetworkParameters, NetworkMetrics]:
         """
         Find optimal network parameters to maximize performance.
         
-        Uses a simple grid search to evaluate different parameter combinations
-        and find the best configuration.
+        Uses a grid search, evaluated in one vectorized pass, over different
+        parameter combinations to find the best configuration.
         
+        Args:
+            baseline_metrics: Already-computed metrics for `self.params`, returned
+                as-is if no grid point scores better or if `self.params` is the winner
+            mtu_values: MTU candidates to search instead of the defaults
+            buffer_sizes: Buffer size candidates to search instead of the defaults
+            
         Returns:
             Tuple[NetworkParameters, NetworkMetrics]: Optimal parameters and resulting metrics
         """
-        # Define parameter ranges to search
-        mtu_values = [1280, 1380, 1420, 1480]
-        buffer_sizes = [100, 500, 1000, 1500, 2000]
-        
-        best_score = -1
-        best_params = None
-        best_metrics = None
-        
-        # Grid search for optimal parameters
-        for mtu in mtu_values:
-            for buffer_size in buffer_sizes:
-                test_params = NetworkParameters(
-                    b_local=self.params.b_local,
-                    b_ec2=self.params.b_ec2,
-                    l_propagation=self.params.l_propagation,
-                    mtu=mtu,
-                    buffer_size=buffer_size,
-                    packet_size=min(mtu - 20, 1400),  # Adjust packet size based on MTU
-                    congestion_level=self.params.congestion_level
-                )
-                
-                metrics = self.calculate_metrics(test_params)
-                self.evaluated_configs.append((test_params, metrics))
-                
-                # Check if this is the best configuration so far
-                if metrics.score > best_score:
-                    best_score = metrics.score
-                    best_params = test_params
-                    best_metrics = metrics
-                    
-                    logger.debug(f"New best configuration: MTU={mtu}, Buffer={buffer_size}, "
-                                f"Score={metrics.score:.4f}, Throughput={metrics.effective_throughput*1000:.2f}Mbps, "
-                                f"Latency={metrics.total_latency:.2f}ms, Loss={metrics.packet_loss*100:.2f}%")
-        
-        if best_params is None:
+        # Define parameter ranges to search (MTUs in ascending order, see below)
+        if mtu_values is None:
+            mtu_values = [1280, 1380, 1420, 1480]
+        if buffer_sizes is None:
+            buffer_sizes = [100, 500, 1000, 1500, 2000]
+        mtu_values = np.sort(np.asarray(mtu_values))
+        buffer_sizes = np.asarray(buffer_sizes)
+        
+        # Bandwidth and congestion are fixed across the grid, so their terms are computed once
+        inv = self._invariants(self.params)
+        
+        # Latency depends only on the MTU and never decreases with it (transmission
+        # and queueing delay both scale with packet size), while packet loss depends
+        # only on the buffer size. The score is separable, so on a valid link the
+        # smallest MTU wins for every buffer and only that row of the grid is
+        # evaluated; argmax over the row keeps the full grid's tie-breaking.
+        if self.params.b_local > 0 and self.params.b_ec2 > 0 and self._w_lat >= 0:
+            mtu_values = mtu_values[:1]
+        
+        grid = self._calculate_metrics_grid(mtu_values, buffer_sizes, self.params, inv)
+        
+        # Append the grid to the columnar record, MTU-major like the scan order
+        grid['mtu'], grid['buffer_size'] = np.meshgrid(mtu_values, buffer_sizes, indexing='ij')
+        self._record_evaluated(grid)
+        
+        # argmax returns the first maximum in row-major order, matching the
+        # MTU-outer, buffer-inner scan this replaces
+        i, j = np.unravel_index(np.argmax(grid['score']), grid['score'].shape)
+        
+        if not grid['score'][i, j] > -1:
             # Default to current parameters if no better solution found
-            best_params = self.params
-            best_metrics = self.calculate_metrics(self.params)
+            if baseline_metrics is None:
+                baseline_metrics = self.calculate_metrics(self.params, inv)
+            return self.params, baseline_metrics
+        
+        # Only the winner is materialized as dataclasses
+        best_params = NetworkParameters(
+            b_local=self.params.b_local,
+            b_ec2=self.params.b_ec2,
+            l_propagation=self.params.l_propagation,
+            mtu=int(mtu_values[i]),
+            buffer_size=int(buffer_sizes[j]),
+            packet_size=int(grid['packet_size'][i, j]),
+            congestion_level=self.params.congestion_level
+        )
+        if baseline_metrics is not None and best_params == self.params:
+            # The current configuration won; report exactly the metrics the caller has
+            best_metrics = baseline_metrics
+        else:
+            best_metrics = NetworkMetrics(
+                effective_throughput=float(grid['effective_throughput'][i, j]),
+                total_latency=float(grid['total_latency'][i, j]),
+                packet_loss=float(grid['packet_loss'][i, j]),
+                queue_length=float(grid['queue_length'][i, j]),
+                utilization=float(grid['utilization'][i, j]),
+                score=float(grid['score'][i, j])
+            )
+        logger.debug(f"Best configuration: MTU={best_params.mtu}, Buffer={best_params.buffer_size}, "
+                    f"Score={best_metrics.score:.4f}, Throughput={best_metrics.effective_throughput*1000:.2f}Mbps, "
+                    f"Latency={best_metrics.total_latency:.2f}ms, Loss={best_metrics.packet_loss*100:.2f}%")
         
         return best_params, best_metrics
     
@@ -239,38 +709,29 @@ class NetworkOptimizer:
             ("Starlink", 0.15)       # 150 Mbps
         ]
         
-        recommendations = []
-        
-        for name, bandwidth in upgrade_options:
-            # Create parameters with upgraded bandwidth
-            upgrade_params = NetworkParameters(
-                b_local=bandwidth,
-                b_ec2=self.params.b_ec2,
-                l_propagation=self.params.l_propagation,
-                mtu=self.params.mtu,
-                buffer_size=self.params.buffer_size,
-                packet_size=self.params.packet_size,
-                congestion_level=self.params.congestion_level
-            )
-            
-            # Calculate potential metrics
-            upgrade_metrics = self.calculate_metrics(upgrade_params)
-            
-            # Calculate improvement factor
-            throughput_improvement = upgrade_metrics.effective_throughput / current_metrics.effective_throughput
-            latency_improvement = current_metrics.total_latency / upgrade_metrics.total_latency
-            
-            recommendations.append({
+        # Calculate potential metrics for every option at once
+        bandwidths = np.array([bandwidth for _, bandwidth in upgrade_options])
+        upgrade = self._calculate_metrics_bandwidths(bandwidths, self.params)
+        
+        # Calculate improvement factors (inf when the current throughput is zero)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            throughput_improvement = upgrade['effective_throughput'] / current_metrics.effective_throughput
+            latency_improvement = current_metrics.total_latency / upgrade['total_latency']
+        
+        recommendations = [
+            {
                 "name": name,
                 "bandwidth_gbps": bandwidth,
                 "bandwidth_mbps": bandwidth * 1000,
-                "effective_throughput_mbps": upgrade_metrics.effective_throughput * 1000,
-                "latency_ms": upgrade_metrics.total_latency,
-                "packet_loss_percent": upgrade_metrics.packet_loss * 100,
-                "throughput_improvement_factor": throughput_improvement,
-                "latency_improvement_factor": latency_improvement,
-                "score": upgrade_metrics.score
-            })
+                "effective_throughput_mbps": float(upgrade['effective_throughput'][k]) * 1000,
+                "latency_ms": float(upgrade['total_latency'][k]),
+                "packet_loss_percent": float(upgrade['packet_loss'][k]) * 100,
+                "throughput_improvement_factor": float(throughput_improvement[k]),
+                "latency_improvement_factor": float(latency_improvement[k]),
+                "score": float(upgrade['score'][k])
+            }
+            for k, (name, bandwidth) in enumerate(upgrade_options)
+        ]
         
         # Sort recommendations by score
         recommendations.sort(key=lambda x: x["score"], reverse=True)
@@ -293,12 +754,15 @@ class NetworkOptimizer:
         
         return result
 
-    def adaptive_mtu_adjustment(self, recent_metrics: List[NetworkMetrics]) -> int:
+    def adaptive_mtu_adjustment(self, recent_metrics: Union[List[NetworkMetrics], RollingMetrics,
+                                                            NetworkMetricsArray]) -> int:
         """
         Dynamically adjust MTU based on recent network performance metrics.
         
         Args:
-            recent_metrics: List of recent network performance metrics
+            recent_metrics: Recent network performance metrics; a RollingMetrics
+                window supplies its averages without a pass over the samples,
+                a NetworkMetricsArray averages its columns in NumPy
             
         Returns:
             Recommended MTU value
@@ -307,8 +771,20 @@ class NetworkOptimizer:
             return self.params.mtu
         
         # Get average packet loss and latency from recent metrics
-        avg_packet_loss = sum(m.packet_loss for m in recent_metrics) / len(recent_metrics)
-        avg_latency = sum(m.total_latency for m in recent_metrics) / len(recent_metrics)
+        if isinstance(recent_metrics, RollingMetrics):
+            avg_packet_loss = recent_metrics.avg_loss()
+            avg_latency = recent_metrics.avg_latency()
+        elif isinstance(recent_metrics, NetworkMetricsArray):
+            avg_packet_loss = float(recent_metrics['packet_loss'].mean())
+            avg_latency = float(recent_metrics['total_latency'].mean())
+        else:
+            # One pass accumulating both sums
+            sum_loss = sum_latency = 0.0
+            for m in recent_metrics:
+                sum_loss += m.packet_loss
+                sum_latency += m.total_latency
+            avg_packet_loss = sum_loss / len(recent_metrics)
+            avg_latency = sum_latency / len(recent_metrics)
         
         current_mtu = self.params.mtu
         
@@ -339,7 +815,7 @@ class NetworkOptimizer:
         current_metrics = self.calculate_metrics(self.params)
         
         # Find optimal parameters
-        optimal_params, optimal_metrics = self.optimize_parameters()
+        optimal_params, optimal_metrics = self.optimize_parameters(current_metrics)
         
         # Generate ISP upgrade recommendation
         upgrade_recommendation = self.recommend_isp_upgrade(current_metrics)
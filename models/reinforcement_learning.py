@@ -20,31 +20,87 @@ import tensorflow as tf
 from tensorflow import keras
 from typing import Dict, List, Tuple, Optional
 import random
+from dataclasses import replace
 from datetime import datetime
 from pathlib import Path
 
 # Local imports
-from models.network_optimization import NetworkParameters, NetworkMetrics
+from models.network_optimization import NetworkParameters, NetworkMetrics, NUMBA_AVAILABLE, njit
 
 logger = logging.getLogger(__name__)
 
 # Define state and action spaces
 STATE_DIM = 3  # [throughput, latency, packet loss]
 ACTION_DIM = 4  # [adjust MTU up, adjust MTU down, toggle split tunnel, prioritize AWS IPs]
+N_ENV = 64      # Simulated environments stepped in lockstep during training
+
+# Reciprocals of the reward baselines: 1.5 Mbps throughput, 100 ms latency, 1 % packet loss
+_INV_THR = 1 / 1.5
+_INV_LAT = 1 / 100
+_INV_PL = 1.0
+
+INFERENCE_BACKENDS = ('numba', 'tflite', 'tf')
+
+
+@njit(cache=True, fastmath=True)
+def _forward_numba(x, W1, b1, W2, b2, W3, b3):
+    """Q-values of one normalized state through the Dense-ReLU-Dense-ReLU-Dense network"""
+    h1 = b1.copy()
+    for i in range(W1.shape[0]):
+        for j in range(W1.shape[1]):
+            h1[j] += x[i] * W1[i, j]
+    for j in range(h1.shape[0]):
+        h1[j] = h1[j] if h1[j] > 0.0 else 0.0
+    
+    h2 = b2.copy()
+    for i in range(W2.shape[0]):
+        for j in range(W2.shape[1]):
+            h2[j] += h1[i] * W2[i, j]
+    for j in range(h2.shape[0]):
+        h2[j] = h2[j] if h2[j] > 0.0 else 0.0
+    
+    q = b3.copy()
+    for i in range(W3.shape[0]):
+        for j in range(W3.shape[1]):
+            q[j] += h2[i] * W3[i, j]
+    return q
+
+
+def _forward_numpy(x, W1, b1, W2, b2, W3, b3):
+    """NumPy version of `_forward_numba`, used when numba is not installed"""
+    h1 = np.maximum(x @ W1 + b1, 0.0)
+    h2 = np.maximum(h1 @ W2 + b2, 0.0)
+    return h2 @ W3 + b3
+
+
+# The loop version is only fast when compiled
+_mlp_forward = _forward_numba if NUMBA_AVAILABLE else _forward_numpy
+
 
 class ExperienceBuffer:
     """
     Implements a replay buffer to store and sample experiences for training.
+    
+    Experiences are kept as preallocated NumPy arrays, one per field, used as a
+    ring: once full, each new experience overwrites the oldest in O(1).
     """
-    def __init__(self, max_size=1000):
+    def __init__(self, max_size=1000, state_dim=STATE_DIM):
         """
         Initialize the experience buffer.
         
         Args:
             max_size: Maximum number of experiences to store
+            state_dim: Length of a state vector
         """
-        self.buffer = []
         self.max_size = max_size
+        self.buf_state = np.empty((max_size, state_dim), dtype=np.float32)
+        self.buf_next = np.empty((max_size, state_dim), dtype=np.float32)
+        self.buf_action = np.empty(max_size, dtype=np.int32)
+        self.buf_reward = np.empty(max_size, dtype=np.float32)
+        self.buf_done = np.empty(max_size, dtype=np.bool_)
+        self.idx = 0        # Slot the next experience is written to
+        self.full = False   # Whether every slot holds an experience
+        self._rng = np.random.default_rng()
         
     def add(self, state, action, reward, next_state, done):
         """
@@ -57,30 +113,114 @@ class ExperienceBuffer:
             next_state: Next state observed
             done: Whether the episode is done
         """
-        experience = (state, action, reward, next_state, done)
-        if len(self.buffer) < self.max_size:
-            self.buffer.append(experience)
-        else:
-            self.buffer.pop(0)
-            self.buffer.append(experience)
+        i = self.idx
+        self.buf_state[i] = state
+        self.buf_next[i] = next_state
+        self.buf_action[i] = action
+        self.buf_reward[i] = reward
+        self.buf_done[i] = done
+        
+        self.idx = (i + 1) % self.max_size
+        if self.idx == 0:
+            self.full = True
             
+    def add_batch(self, states, actions, rewards, next_states, dones):
+        """
+        Add a batch of experiences, in order, to the buffer.
+        
+        Args:
+            states: (n, state_dim) array of current states
+            actions: Length-n array of actions taken
+            rewards: Length-n array of rewards received
+            next_states: (n, state_dim) array of next states observed
+            dones: Length-n array of episode-done flags
+        """
+        n = len(actions)
+        # Only the newest max_size experiences would survive the wraparound
+        skip = max(0, n - self.max_size)
+        slots = (self.idx + skip + np.arange(n - skip)) % self.max_size
+        self.buf_state[slots] = states[skip:]
+        self.buf_next[slots] = next_states[skip:]
+        self.buf_action[slots] = actions[skip:]
+        self.buf_reward[slots] = rewards[skip:]
+        self.buf_done[slots] = dones[skip:]
+        
+        if self.idx + n >= self.max_size:
+            self.full = True
+        self.idx = (self.idx + n) % self.max_size
+        
     def sample(self, batch_size):
         """
         Sample a batch of experiences from the buffer.
         
+        Indices are drawn uniformly with replacement, as in standard DQN
+        experience replay, so a batch may repeat an experience.
+        
         Args:
             batch_size: Number of experiences to sample
             
         Returns:
-            Tuple of states, actions, rewards, next_states, dones
+            Tuple of arrays: states, actions, rewards, next_states, dones
         """
-        batch = random.sample(self.buffer, min(batch_size, len(self.buffer)))
-        states, actions, rewards, next_states, dones = zip(*batch)
-        return states, actions, rewards, next_states, dones
+        n = self.size()
+        idx = self._rng.integers(0, n, size=min(batch_size, n))
+        return (
+            np.take(self.buf_state, idx, axis=0),
+            np.take(self.buf_action, idx),
+            np.take(self.buf_reward, idx),
+            np.take(self.buf_next, idx, axis=0),
+            np.take(self.buf_done, idx)
+        )
     
     def size(self):
         """Get the current size of the buffer."""
-        return len(self.buffer)
+        return self.max_size if self.full else self.idx
+
+
+class HistoryRing:
+    """
+    Fixed-size ring buffer of the most recent values of a training statistic.
+    
+    Memory stays bounded however long training runs, and the mean of the
+    window is a single NumPy reduction.
+    """
+    def __init__(self, size=100):
+        """
+        Initialize an empty ring.
+        
+        Args:
+            size: Number of most recent values to keep
+        """
+        self.values = np.zeros(size, dtype=np.float32)
+        self.idx = 0     # Slot the next value is written to
+        self.count = 0   # Number of slots holding a value
+        
+    def append(self, value):
+        """Add a value, overwriting the oldest one if the ring is full."""
+        self.values[self.idx] = value
+        self.idx = (self.idx + 1) % len(self.values)
+        self.count = min(self.count + 1, len(self.values))
+        
+    def extend(self, values):
+        """Add several values in order."""
+        values = np.asarray(values, dtype=np.float32)[-len(self.values):]
+        slots = (self.idx + np.arange(len(values))) % len(self.values)
+        self.values[slots] = values
+        self.idx = (self.idx + len(values)) % len(self.values)
+        self.count = min(self.count + len(values), len(self.values))
+        
+    def mean(self):
+        """Mean of the stored values, or 0 if there are none."""
+        return float(self.values[:self.count].mean()) if self.count else 0.0
+    
+    def tolist(self):
+        """Stored values, oldest first."""
+        if self.count < len(self.values):
+            return self.values[:self.count].tolist()
+        return np.roll(self.values, -self.idx).tolist()
+    
+    def __len__(self):
+        return self.count
 
 
 class RoutingAgent:
@@ -91,7 +231,8 @@ class RoutingAgent:
     routing parameters based on network conditions.
     """
     def __init__(self, learning_rate=0.001, gamma=0.95, epsilon=1.0, epsilon_decay=0.995,
-                 epsilon_min=0.1, batch_size=32, memory_size=1000, model_dir='./models/saved_rl'):
+                 epsilon_min=0.1, batch_size=32, memory_size=1000, model_dir='./models/saved_rl',
+                 train_every=4, inference_backend='numba', inference_only=False):
         """
         Initialize the routing agent.
         
@@ -104,7 +245,17 @@ class RoutingAgent:
             batch_size: Batch size for training
             memory_size: Size of the experience replay buffer
             model_dir: Directory to save/load the model
+            train_every: Environment steps remembered between training steps; each
+                training step uses a batch of train_every * batch_size experiences
+            inference_backend: How `choose_action` evaluates the Q-network: 'numba'
+                (NumPy weight copy, compiled when numba is installed), 'tflite'
+                (INT8-quantized copy) or 'tf' (the Keras model itself)
+            inference_only: Skip the optimizer; the agent can choose actions but
+                not remember experiences or train
         """
+        if inference_backend not in INFERENCE_BACKENDS:
+            raise ValueError(f"inference_backend must be one of {INFERENCE_BACKENDS}")
+        
         self.state_dim = STATE_DIM
         self.action_dim = ACTION_DIM
         self.learning_rate = learning_rate
@@ -113,29 +264,60 @@ class RoutingAgent:
         self.epsilon_decay = epsilon_decay
         self.epsilon_min = epsilon_min
         self.batch_size = batch_size
-        self.memory = ExperienceBuffer(memory_size)
+        self.memory_size = memory_size
+        self.train_every = train_every
+        self.inference_backend = inference_backend
+        self.inference_only = inference_only
+        self._steps_since_train = 0
+        
+        # Expected upper bound of each state dimension (lower bounds are 0) and
+        # its reciprocal: 0-10 Mbps throughput, 0-300 ms latency, 0-10 % loss
+        self._max = np.array([10.0, 300.0, 10.0], dtype=np.float32)
+        self._inv = np.array([1 / 10.0, 1 / 300.0, 1 / 10.0], dtype=np.float32)
         self.model_dir = Path(model_dir)
         self.model_dir.mkdir(exist_ok=True, parents=True)
-        self.model_path = self.model_dir / 'routing_agent_model'
+        self.model_path = self.model_dir / 'routing_agent_model'  # Full Keras model (older saves)
+        self.weights_path = self.model_dir / 'routing_agent.weights.h5'
         
         # Create or load Q-Network
-        if os.path.exists(str(self.model_path)):
+        if os.path.exists(str(self.weights_path)) or os.path.exists(str(self.model_path)):
             self.model = self._load_model()
-            logger.info(f"Loaded RL model from {self.model_path}")
+            logger.info(f"Loaded RL model from {self.model_dir}")
             # Use lower epsilon for loaded models (less exploration)
             self.epsilon = max(0.2, self.epsilon_min)
         else:
             self.model = self._build_model()
             logger.info("Created new RL model")
             
-        # Target network for stability
-        self.target_model = self._build_model()
-        self.update_target_model()
+        # Compiled graph for Q-values of a state batch, traced once for any batch size
+        self._q_values = tf.function(
+            lambda state: self.model(state, training=False),
+            input_signature=[tf.TensorSpec([None, self.state_dim], tf.float32)]
+        )
+        
+        # Single-state inference reads a preallocated input variable, so the
+        # graph is traced once and no input tensor is built per decision
+        self._scratch_in = tf.Variable(tf.zeros((1, self.state_dim), tf.float32), trainable=False)
+        self._predict_one = tf.function(lambda: self.model(self._scratch_in, training=False))
+        
+        # Replay buffer, target network and training step, built on first use
+        # so agents that only choose actions never allocate them
+        self.memory = None
+        self.target_model = None
+        
+        # Copies of the Q-network for action selection: float32 weight arrays
+        # for the 'numba' backend, re-copied on the first decision after each
+        # training step, and an INT8 TFLite model for 'tflite', rebuilt on every
+        # target update (once the replay buffer can calibrate it)
+        self._np_weights = None
+        self._np_weights_stale = False
+        self._interp = None
+        self._refresh_inference_copies()
         
         # Training metrics
-        self.loss_history = []
-        self.reward_history = []
-        self.q_value_history = []
+        self.loss_history = HistoryRing()
+        self.reward_history = HistoryRing()
+        self.q_value_history = HistoryRing()
         
         # Action definitions with descriptions
         self.actions = [
@@ -145,25 +327,63 @@ class RoutingAgent:
             {"id": 3, "name": "prioritize_aws", "description": "Toggle AWS IP prioritization"}
         ]
         
+        # Implementation of each action, indexed like `self.actions`
+        self._action_fns = (self._act_mtu_up, self._act_mtu_down, self._act_toggle_split, self._act_toggle_aws)
+        
+    @classmethod
+    def for_inference(cls, model_dir='./models/saved_rl', inference_backend='numba'):
+        """
+        Create an agent that only chooses actions, e.g. in a deployed router.
+        
+        Args:
+            model_dir: Directory to load the model from
+            inference_backend: See `__init__`
+            
+        Returns:
+            RoutingAgent without optimizer, replay buffer or target network
+        """
+        return cls(model_dir=model_dir, inference_backend=inference_backend, inference_only=True)
+    
+    def _ensure_training_graph(self):
+        """Build the replay buffer, target network and training step if not done yet."""
+        if self.memory is not None:
+            return
+        if self.inference_only:
+            raise RuntimeError("RoutingAgent was created for inference only and cannot train")
+        
+        self.memory = ExperienceBuffer(self.memory_size)
+        
+        # Compiled graph for the training step
+        self._train_step = tf.function(self._train_step_impl, jit_compile=True)
+        
+        # Target network for stability, synced variable by variable in-graph
+        self.target_model = self._build_model()
+        self._var_pairs = list(zip(self.target_model.variables, self.model.variables))
+        self._sync_target = tf.function(self._sync_target_impl)
+        self._sync_target()
+        
     def _build_model(self):
         """
         Build a neural network model for Q-learning.
         
         Returns:
-            Compiled Keras model
+            Keras model, compiled unless the agent is inference-only
         """
+        # States are fed as float32 arrays, matching the declared input dtype
         model = keras.Sequential([
-            keras.layers.Dense(64, activation='relu', input_dim=self.state_dim),
+            keras.Input(shape=(self.state_dim,), dtype='float32'),
+            keras.layers.Dense(64, activation='relu'),
             keras.layers.Dense(64, activation='relu'),
             keras.layers.Dense(self.action_dim, activation='linear')
         ])
         
-        model.compile(loss='mse', optimizer=keras.optimizers.Adam(learning_rate=self.learning_rate))
+        if not self.inference_only:
+            model.compile(loss='mse', optimizer=keras.optimizers.Adam(learning_rate=self.learning_rate))
         return model
     
     def _save_model(self):
-        """Save the current model to disk."""
-        self.model.save(str(self.model_path))
+        """Save the current model's weights to disk."""
+        self.model.save_weights(str(self.weights_path))
         
         # Save metadata (hyperparameters)
         metadata = {
@@ -174,35 +394,97 @@ class RoutingAgent:
             "batch_size": self.batch_size,
             "state_dim": self.state_dim,
             "action_dim": self.action_dim,
-            "loss_history": self.loss_history[-100:] if self.loss_history else [],
-            "reward_history": self.reward_history[-100:] if self.reward_history else []
+            "loss_history": self.loss_history.tolist(),
+            "reward_history": self.reward_history.tolist()
         }
         
         with open(str(self.model_dir / 'metadata.json'), 'w') as f:
             json.dump(metadata, f, indent=2)
             
-        logger.info(f"Saved model to {self.model_path}")
+        logger.info(f"Saved model to {self.weights_path}")
         
     def _load_model(self):
         """
         Load a saved model from disk.
         
+        Weights are loaded into a freshly built network, which skips restoring
+        optimizer state and the serialized graph; a full Keras model saved by
+        older versions is still loaded as such.
+        
         Returns:
             Loaded Keras model
         """
         try:
-            return keras.models.load_model(str(self.model_path))
+            if os.path.exists(str(self.weights_path)):
+                model = self._build_model()
+                model.load_weights(str(self.weights_path))
+                return model
+            return keras.models.load_model(str(self.model_path), compile=not self.inference_only)
         except Exception as e:
             logger.error(f"Error loading model: {e}")
             return self._build_model()
         
+    def _compile_fast_inference(self):
+        """
+        Convert the Q-network to an INT8 TFLite model for `choose_action`.
+        
+        Post-training quantization is calibrated on states drawn from the
+        replay buffer, so this does nothing while the buffer is empty. If
+        conversion fails, action selection keeps using the Keras model.
+        """
+        n = self.memory.size() if self.memory is not None else 0
+        if n == 0:
+            return
+        calibration = self._normalize_state(self.memory.buf_state[:n])
+        
+        def representative_dataset():
+            for i in np.random.randint(0, n, size=min(n, 100)):
+                yield [calibration[i:i + 1]]
+        
+        try:
+            converter = tf.lite.TFLiteConverter.from_keras_model(self.model)
+            converter.optimizations = [tf.lite.Optimize.DEFAULT]
+            converter.representative_dataset = representative_dataset
+            converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+            interp = tf.lite.Interpreter(model_content=converter.convert())
+            interp.allocate_tensors()
+        except Exception as e:
+            logger.warning(f"TFLite conversion failed, using Keras for inference: {e}")
+            self._interp = None
+            return
+        
+        self._interp_in = interp.get_input_details()[0]['index']
+        self._interp_out = interp.get_output_details()[0]['index']
+        self._interp = interp
+        
+    def _sync_weights_to_numpy(self):
+        """Copy the Q-network's weights into the float32 arrays `_mlp_forward` takes."""
+        self._np_weights = tuple(
+            np.ascontiguousarray(w, dtype=np.float32) for w in self.model.get_weights()
+        )
+        self._np_weights_stale = False
+        
+    def _sync_target_impl(self):
+        """Assign each Q-network variable to its target-network counterpart."""
+        for target_var, var in self._var_pairs:
+            target_var.assign(var)
+        
+    def _refresh_inference_copies(self):
+        """Refresh the Q-network copy the inference backend reads, if it uses one."""
+        if self.inference_backend == 'numba':
+            self._sync_weights_to_numpy()
+        elif self.inference_backend == 'tflite':
+            self._compile_fast_inference()
+        
     def update_target_model(self):
         """Update the target model with weights from the current model."""
-        self.target_model.set_weights(self.model.get_weights())
+        self._ensure_training_graph()
+        self._sync_target()
+        self._refresh_inference_copies()
         
     def remember(self, state, action, reward, next_state, done):
         """
-        Store experience in memory for replay.
+        Store experience in memory for replay, training every `train_every` calls.
         
         Args:
             state: Current state
@@ -211,7 +493,39 @@ class RoutingAgent:
             next_state: Next state observed
             done: Whether the episode is done
         """
+        self._ensure_training_graph()
         self.memory.add(state, action, reward, next_state, done)
+        self._count_steps(1)
+        
+    def remember_batch(self, states, actions, rewards, next_states, dones):
+        """
+        Store a batch of experiences (one per row) in memory for replay.
+        
+        Each row counts as one environment step towards `train_every`, so a
+        batch trains as often as remembering its rows one at a time would.
+        
+        Args:
+            states: Current states
+            actions: Actions taken
+            rewards: Rewards received
+            next_states: Next states observed
+            dones: Whether each episode is done
+        """
+        self._ensure_training_graph()
+        self.memory.add_batch(states, actions, rewards, next_states, dones)
+        self._count_steps(len(dones))
+        
+    def _count_steps(self, n):
+        """
+        Count n remembered environment steps, training once per `train_every` steps.
+        
+        Each training step covers `train_every` environment steps, so it uses a
+        proportionally larger batch and decays epsilon once for each of them.
+        """
+        self._steps_since_train += n
+        updates, self._steps_since_train = divmod(self._steps_since_train, self.train_every)
+        for _ in range(updates):
+            self.train(batch_size=self.train_every * self.batch_size, decay_steps=self.train_every)
         
     def choose_action(self, state, explore=True):
         """
@@ -232,53 +546,106 @@ class RoutingAgent:
             # Random action (exploration)
             return random.randrange(self.action_dim)
         
-        # Reshape state for model prediction
-        state_tensor = np.reshape(norm_state, [1, self.state_dim])
-        
-        # Get Q-values for all actions
-        q_values = self.model.predict(state_tensor, verbose=0)[0]
+        # Get Q-values for all actions from the configured backend; TFLite
+        # falls back to Keras until its quantized copy has been built
+        if self.inference_backend == 'numba':
+            if self._np_weights_stale:
+                self._sync_weights_to_numpy()
+            q_values = _mlp_forward(norm_state, *self._np_weights)
+        else:
+            # Reshape state for model prediction
+            state_tensor = np.reshape(norm_state, [1, self.state_dim])
+            
+            if self._interp is not None:
+                self._interp.set_tensor(self._interp_in, state_tensor)
+                self._interp.invoke()
+                q_values = self._interp.get_tensor(self._interp_out)[0]
+            else:
+                self._scratch_in.assign(state_tensor)
+                q_values = self._predict_one().numpy()[0]
         self.q_value_history.append(np.max(q_values))
         
         # Return action with highest Q-value (exploitation)
         return np.argmax(q_values)
     
-    def _normalize_state(self, state):
+    def choose_actions_batch(self, states, explore=True):
+        """
+        Choose actions for a batch of states with a single forward pass.
+        
+        Args:
+            states: (n, STATE_DIM) array of raw state vectors
+            explore: Whether to explore randomly (True) or exploit (False)
+            
+        Returns:
+            Array of n selected action indices
+        """
+        q_values = self._q_values(self._normalize_state(states)).numpy()
+        actions = np.argmax(q_values, axis=1)
+        
+        # Epsilon-greedy, drawn independently for each state
+        if explore:
+            explored = np.random.rand(len(actions)) < self.epsilon
+            actions[explored] = np.random.randint(self.action_dim, size=int(explored.sum()))
+            q_values = q_values[~explored]
+        self.q_value_history.extend(np.max(q_values, axis=1))
+        
+        return actions
+    
+    def _normalize_state(self, state, out=None):
         """
-        Normalize the state vector for the neural network.
+        Normalize state vectors for the neural network.
         
         Args:
-            state: Raw state vector [throughput (Mbps), latency (ms), packet_loss (%)]
+            state: Raw state vector [throughput (Mbps), latency (ms), packet_loss (%)],
+                or a (batch, STATE_DIM) array of them
+            out: Optional float32 array to write the result into (may be `state`)
             
         Returns:
-            Normalized state vector
+            Normalized float32 array of the same shape, each component in [0, 1]
         """
-        # Define expected ranges for each state dimension
-        throughput_range = [0, 10]      # 0-10 Mbps
-        latency_range = [0, 300]        # 0-300 ms
-        packet_loss_range = [0, 10]     # 0-10 %
+        if out is None:
+            out = np.empty(np.shape(state), dtype=np.float32)
+        np.clip(state, 0, self._max, out=out)
+        return np.multiply(out, self._inv, out=out)
+    
+    def _train_step_impl(self, states, actions, rewards, next_states, dones):
+        """
+        One DQN update on a normalized batch; compiled as `self._train_step`.
+        
+        The target for the taken action is reward + gamma * max Q_target(next
+        state), or just the reward at the end of an episode; the other actions
+        keep their current Q-values, so only the taken action contributes to
+        the MSE (averaged over all actions, as with `fit` on a full target).
         
-        # Extract state components
-        throughput, latency, packet_loss = state
+        Returns:
+            Training loss
+        """
+        next_q = tf.reduce_max(self.target_model(next_states, training=False), axis=1)
+        target_q = rewards + self.gamma * next_q * (1.0 - tf.cast(dones, tf.float32))
+        mask = tf.one_hot(actions, self.action_dim)
         
-        # Normalize each component to [0, 1] range
-        norm_throughput = min(max(throughput, throughput_range[0]), throughput_range[1]) / throughput_range[1]
-        norm_latency = min(max(latency, latency_range[0]), latency_range[1]) / latency_range[1]
-        norm_packet_loss = min(max(packet_loss, packet_loss_range[0]), packet_loss_range[1]) / packet_loss_range[1]
+        with tf.GradientTape() as tape:
+            q = self.model(states, training=True)
+            loss = tf.reduce_mean(tf.square(mask * (target_q[:, None] - q)))
         
-        return [norm_throughput, norm_latency, norm_packet_loss]
+        variables = self.model.trainable_variables
+        self.model.optimizer.apply_gradients(zip(tape.gradient(loss, variables), variables))
+        return loss
     
-    def train(self, batch_size=None):
+    def train(self, batch_size=None, decay_steps=1):
         """
         Train the model on a batch of experiences.
         
         Args:
             batch_size: Size of batch to train on (default: self.batch_size)
+            decay_steps: Number of epsilon decays this training step stands for
             
         Returns:
             Training loss
         """
         if batch_size is None:
             batch_size = self.batch_size
+        self._ensure_training_graph()
             
         # Skip training if buffer is too small
         if self.memory.size() < batch_size:
@@ -287,34 +654,18 @@ class RoutingAgent:
         # Sample batch from memory
         states, actions, rewards, next_states, dones = self.memory.sample(batch_size)
         
-        # Convert to numpy arrays
-        states = np.array([self._normalize_state(s) for s in states])
-        next_states = np.array([self._normalize_state(s) for s in next_states])
-        rewards = np.array(rewards)
-        actions = np.array(actions)
-        dones = np.array(dones, dtype=np.bool_)
-        
-        # Get current Q-values
-        current_q = self.model.predict(states, verbose=0)
+        # Normalize both state batches in place (sample() returns copies)
+        self._normalize_state(states, out=states)
+        self._normalize_state(next_states, out=next_states)
         
-        # Get next Q-values from target model
-        next_q = self.target_model.predict(next_states, verbose=0)
-        
-        # Update target Q-values with reward and discounted future rewards
-        for i in range(batch_size):
-            if dones[i]:
-                current_q[i, actions[i]] = rewards[i]
-            else:
-                current_q[i, actions[i]] = rewards[i] + self.gamma * np.max(next_q[i])
-        
-        # Train the model
-        history = self.model.fit(states, current_q, epochs=1, verbose=0)
-        loss = history.history['loss'][0]
+        # Bellman update and gradient step in one compiled graph
+        loss = float(self._train_step(states, actions, rewards, next_states, dones))
         self.loss_history.append(loss)
+        self._np_weights_stale = True
         
         # Decay epsilon for less exploration over time
         if self.epsilon > self.epsilon_min:
-            self.epsilon *= self.epsilon_decay
+            self.epsilon *= self.epsilon_decay ** decay_steps
         
         return loss
     
@@ -337,97 +688,137 @@ class RoutingAgent:
         w3 = 0.2  # Packet loss weight
         
         # Get current values from metrics
-        throughput = metrics.effective_throughput * 1000  # Convert to Mbps
-        latency = metrics.total_latency
-        packet_loss = metrics.packet_loss * 100  # Convert to percentage
+        t = metrics.effective_throughput * 1000.0  # Convert to Mbps
+        l = metrics.total_latency
+        p = metrics.packet_loss * 100.0  # Convert to percentage
         
         # Calculate base reward
         # Throughput is good (positive reward), latency and packet loss are bad (negative reward)
-        base_reward = (
-            w1 * min(throughput / 1.5, 5.0) -  # Normalize to 1.5 Mbps baseline, cap at 5x
-            w2 * min(latency / 100, 3.0) -     # Normalize to 100ms baseline, cap at 3x
-            w3 * min(packet_loss / 1.0, 10.0)  # Normalize to 1% baseline, cap at 10x
+        reward = (
+            w1 * min(t * _INV_THR, 5.0) -   # Normalize to 1.5 Mbps baseline, cap at 5x
+            w2 * min(l * _INV_LAT, 3.0) -   # Normalize to 100ms baseline, cap at 3x
+            w3 * min(p * _INV_PL, 10.0)     # Normalize to 1% baseline, cap at 10x
         )
         
-        # Add bonus for improvement if we have previous metrics
+        # Add bonus for improvement if we have previous metrics; each
+        # improvement is 0 when the previous value is not positive
         if prev_metrics is not None:
-            prev_throughput = prev_metrics.effective_throughput * 1000
-            prev_latency = prev_metrics.total_latency
-            prev_packet_loss = prev_metrics.packet_loss * 100
-            
-            # Calculate improvement percentages
-            if prev_throughput > 0:
-                throughput_improvement = (throughput - prev_throughput) / prev_throughput
-            else:
-                throughput_improvement = 0
-                
-            if prev_latency > 0:
-                latency_improvement = (prev_latency - latency) / prev_latency
-            else:
-                latency_improvement = 0
-                
-            if prev_packet_loss > 0:
-                packet_loss_improvement = (prev_packet_loss - packet_loss) / prev_packet_loss
-            else:
-                packet_loss_improvement = 0
-            
-            # Calculate improvement reward
-            improvement_reward = (
-                w1 * min(throughput_improvement, 1.0) +
-                w2 * min(latency_improvement, 1.0) +
-                w3 * min(packet_loss_improvement, 1.0)
+            pt = prev_metrics.effective_throughput * 1000.0
+            pl = prev_metrics.total_latency
+            pp = prev_metrics.packet_loss * 100.0
+            reward += (
+                w1 * (min((t - pt) / pt, 1.0) if pt > 0 else 0.0) +
+                w2 * (min((pl - l) / pl, 1.0) if pl > 0 else 0.0) +
+                w3 * (min((pp - p) / pp, 1.0) if pp > 0 else 0.0)
             )
-            
-            # Add improvement bonus
-            reward = base_reward + improvement_reward
-        else:
-            reward = base_reward
         
-        # Add additional reward for good absolute performance
-        if throughput > 1.0 and latency < 70 and packet_loss < 2.0:
-            reward += 1.0  # Bonus for good overall performance
-            
-        # Penalize very poor performance
-        if throughput < 0.1 or latency > 200 or packet_loss > 15.0:
-            reward -= 2.0  # Penalty for poor performance
+        # Bonus for good overall performance, penalty for poor performance
+        reward += 1.0 if (t > 1.0 and l < 70 and p < 2.0) else 0.0
+        reward -= 2.0 if (t < 0.1 or l > 200 or p > 15.0) else 0.0
         
         # Track reward history
         self.reward_history.append(reward)
         
         return reward
     
-    def apply_action(self, action_idx: int, current_params: Dict[str, any]) -> Dict[str, any]:
+    def calculate_rewards(self, t, l, p, pt=None, pl=None, pp=None) -> np.ndarray:
         """
-        Apply the selected action to the current parameters.
+        Vectorized `calculate_reward` for a batch of transitions.
+        
+        Takes state-vector units (see `state_from_metrics`) rather than
+        NetworkMetrics, so the columns of a state batch can be passed as-is.
         
         Args:
-            action_idx: Index of the action to apply
-            current_params: Current network parameters
+            t, l, p: Arrays of current throughput (Mbps), latency (ms) and packet loss (%)
+            pt, pl, pp: Arrays of the previous values (for calculating improvement),
+                or None to score absolute performance only
             
         Returns:
-            Updated parameters after applying the action
+            Array of reward values
         """
-        action = self.actions[action_idx]
-        new_params = current_params.copy()
+        # Weights for different metrics
+        w1 = 0.5  # Throughput weight
+        w2 = 0.3  # Latency weight
+        w3 = 0.2  # Packet loss weight
         
-        logger.info(f"Applying RL action: {action['name']} - {action['description']}")
+        t, l, p = np.asarray(t, dtype=np.float64), np.asarray(l, dtype=np.float64), np.asarray(p, dtype=np.float64)
         
-        if action["name"] == "increase_mtu":
-            # Increase MTU by 40 bytes, up to maximum of 1500
-            new_params["mtu"] = min(current_params["mtu"] + 40, 1500)
-            
-        elif action["name"] == "decrease_mtu":
-            # Decrease MTU by 40 bytes, with minimum of 1280
-            new_params["mtu"] = max(current_params["mtu"] - 40, 1280)
-            
-        elif action["name"] == "toggle_split_tunnel":
-            # Toggle between full tunnel and split tunnel mode
-            new_params["direct_tunnel"] = not current_params.get("direct_tunnel", True)
+        # Calculate base reward
+        reward = (
+            w1 * np.minimum(t / 1.5, 5.0) -   # Normalize to 1.5 Mbps baseline, cap at 5x
+            w2 * np.minimum(l / 100, 3.0) -   # Normalize to 100ms baseline, cap at 3x
+            w3 * np.minimum(p / 1.0, 10.0)    # Normalize to 1% baseline, cap at 10x
+        )
+        
+        # Add bonus for improvement if we have previous values; improvement
+        # is 0 wherever the previous value is not positive
+        if pt is not None:
+            def improvement(gain, prev):
+                return np.minimum(np.divide(gain, prev, out=np.zeros_like(gain), where=prev > 0), 1.0)
             
-        elif action["name"] == "prioritize_aws":
-            # Toggle AWS IP prioritization
-            new_params["prioritize_aws"] = not current_params.get("prioritize_aws", False)
+            pt, pl, pp = np.asarray(pt, dtype=np.float64), np.asarray(pl, dtype=np.float64), np.asarray(pp, dtype=np.float64)
+            reward += (
+                w1 * improvement(t - pt, pt) +
+                w2 * improvement(pl - l, pl) +
+                w3 * improvement(pp - p, pp)
+            )
+        
+        # Bonus for good absolute performance, penalty for very poor performance
+        reward += np.where((t > 1.0) & (l < 70) & (p < 2.0), 1.0, 0.0)
+        reward -= np.where((t < 0.1) | (l > 200) | (p > 15.0), 2.0, 0.0)
+        
+        # Track reward history
+        self.reward_history.extend(reward)
+        
+        return reward
+    
+    def _act_mtu_up(self, params: Dict[str, any]) -> None:
+        """Increase MTU by 40 bytes, up to maximum of 1500"""
+        params["mtu"] = min(params["mtu"] + 40, 1500)
+    
+    def _act_mtu_down(self, params: Dict[str, any]) -> None:
+        """Decrease MTU by 40 bytes, with minimum of 1280"""
+        params["mtu"] = max(params["mtu"] - 40, 1280)
+    
+    def _act_toggle_split(self, params: Dict[str, any]) -> None:
+        """Toggle between full tunnel and split tunnel mode"""
+        params["direct_tunnel"] = not params.get("direct_tunnel", True)
+    
+    def _act_toggle_aws(self, params: Dict[str, any]) -> None:
+        """Toggle AWS IP prioritization"""
+        params["prioritize_aws"] = not params.get("prioritize_aws", False)
+    
+    def apply_action(self, action_idx: int, params: Dict[str, any]) -> None:
+        """
+        Apply the selected action to the parameters, in place.
+        
+        The dict is modified rather than copied; callers that need the
+        previous values should use `apply_action_immutable`.
+        
+        Args:
+            action_idx: Index of the action to apply
+            params: Current network parameters, updated by the action
+        """
+        # Called for every simulated step during training, so keep it off the INFO path
+        if logger.isEnabledFor(logging.DEBUG):
+            action = self.actions[action_idx]
+            logger.debug("Applying RL action: %s - %s", action["name"], action["description"])
+        
+        self._action_fns[action_idx](params)
+    
+    def apply_action_immutable(self, action_idx: int, current_params: Dict[str, any]) -> Dict[str, any]:
+        """
+        Apply the selected action to a copy of the current parameters.
         
+        Args:
+            action_idx: Index of the action to apply
+            current_params: Current network parameters (left unchanged)
+            
+        Returns:
+            Updated parameters after applying the action
+        """
+        new_params = current_params.copy()
+        self.apply_action(action_idx, new_params)
         return new_params
     
     def save(self):
@@ -443,10 +834,10 @@ class RoutingAgent:
         """
         return {
             "epsilon": self.epsilon,
-            "memory_size": self.memory.size(),
-            "avg_q_value": sum(self.q_value_history[-100:]) / max(1, len(self.q_value_history[-100:])) if self.q_value_history else 0,
-            "avg_reward": sum(self.reward_history[-100:]) / max(1, len(self.reward_history[-100:])) if self.reward_history else 0,
-            "avg_loss": sum(self.loss_history[-100:]) / max(1, len(self.loss_history[-100:])) if self.loss_history else 0,
+            "memory_size": self.memory.size() if self.memory is not None else 0,
+            "avg_q_value": self.q_value_history.mean(),
+            "avg_reward": self.reward_history.mean(),
+            "avg_loss": self.loss_history.mean(),
             "action_defs": self.actions
         }
 
@@ -468,13 +859,18 @@ def state_from_metrics(metrics: NetworkMetrics) -> List[float]:
     return [throughput, latency, packet_loss]
 
 
-def train_on_simulated_data(agent: RoutingAgent, episodes=100):
+def train_on_simulated_data(agent: RoutingAgent, episodes=100, n_env=N_ENV):
     """
     Train the RL agent on simulated network data.
     
+    Episodes run `n_env` at a time in lockstep: each step chooses actions for
+    every environment in one batched forward pass and stores all transitions
+    at once; the agent trains on a larger batch every `train_every` steps.
+    
     Args:
         agent: RoutingAgent instance
         episodes: Number of training episodes
+        n_env: Number of episodes simulated side by side
         
     Returns:
         Trained agent
@@ -489,85 +885,83 @@ def train_on_simulated_data(agent: RoutingAgent, episodes=100):
     
     logger.info(f"Training RL agent on {episodes} simulated episodes")
     
-    for episode in range(episodes):
-        # Randomly select network conditions
-        congestion = np.random.choice(congestion_levels)
-        bandwidth = np.random.choice(bandwidths)
+    # Transitions stored so far; the target network is synced each time they
+    # add up to another 10 episodes (of 5 steps), as when episodes ran one by one
+    transitions = 0
+    sync_every = 10 * 5
+    
+    for first_episode in range(0, episodes, n_env):
+        n = min(n_env, episodes - first_episode)
         
-        # Create initial parameters
-        params = NetworkParameters(
-            b_local=bandwidth,
-            b_ec2=1.0,
-            l_propagation=20.0 + congestion * 100,  # 20-120ms
-            mtu=1420,
-            buffer_size=1000,
-            packet_size=1400,
-            congestion_level=congestion
-        )
+        # Randomly select network conditions for each environment
+        congestions = np.random.choice(congestion_levels, size=n)
+        local_bandwidths = np.random.choice(bandwidths, size=n)
         
-        # Calculate initial metrics
-        metrics = optimizer.calculate_metrics(params)
+        # Create initial parameters
+        params = [
+            NetworkParameters(
+                b_local=bandwidth,
+                b_ec2=1.0,
+                l_propagation=20.0 + congestion * 100,  # 20-120ms
+                mtu=1420,
+                buffer_size=1000,
+                packet_size=1400,
+                congestion_level=congestion
+            )
+            for bandwidth, congestion in zip(local_bandwidths, congestions)
+        ]
         
-        # Convert to state
-        state = state_from_metrics(metrics)
+        # Calculate initial metrics and convert to states
+        metrics = [optimizer.calculate_metrics(p) for p in params]
+        states = np.array([state_from_metrics(m) for m in metrics])
         
-        # Initial parameters as dict for action application
-        param_dict = {
-            "mtu": params.mtu,
-            "direct_tunnel": True,
-            "prioritize_aws": False
-        }
+        # Initial parameters as dicts for action application
+        param_dicts = [
+            {"mtu": p.mtu, "direct_tunnel": True, "prioritize_aws": False}
+            for p in params
+        ]
         
         # Take 5 actions per episode
         for step in range(5):
-            # Choose action
-            action = agent.choose_action(state)
+            # Choose actions for all environments at once
+            actions = agent.choose_actions_batch(states)
             
-            # Apply action to parameters
-            new_param_dict = agent.apply_action(action, param_dict)
+            # Apply actions to each environment's parameter dict in place
+            for action, param_dict in zip(actions, param_dicts):
+                agent.apply_action(action, param_dict)
             
             # Update network parameters
-            new_params = NetworkParameters(
-                b_local=params.b_local,
-                b_ec2=params.b_ec2,
-                l_propagation=params.l_propagation,
-                mtu=new_param_dict["mtu"],
-                buffer_size=params.buffer_size,
-                packet_size=min(new_param_dict["mtu"] - 20, 1400),
-                congestion_level=params.congestion_level
-            )
+            new_params = [
+                replace(p, mtu=d["mtu"], packet_size=min(d["mtu"] - 20, 1400))
+                for p, d in zip(params, param_dicts)
+            ]
             
-            # Calculate new metrics
-            new_metrics = optimizer.calculate_metrics(new_params)
+            # Calculate new metrics and convert to next states
+            new_metrics = [optimizer.calculate_metrics(p) for p in new_params]
+            next_states = np.array([state_from_metrics(m) for m in new_metrics])
             
-            # Convert to next state
-            next_state = state_from_metrics(new_metrics)
+            # Calculate rewards
+            rewards = agent.calculate_rewards(next_states[:, 0], next_states[:, 1], next_states[:, 2],
+                                              states[:, 0], states[:, 1], states[:, 2])
             
-            # Calculate reward
-            reward = agent.calculate_reward(new_metrics, metrics)
+            # Store in replay buffer (the agent trains every `train_every` steps)
+            dones = np.full(n, step == 4)  # Last step in episode
+            agent.remember_batch(states, actions, rewards, next_states, dones)
             
-            # Store in replay buffer
-            done = (step == 4)  # Last step in episode
-            agent.remember(state, action, reward, next_state, done)
+            # Update target network every 10 episodes' worth of transitions
+            if (transitions + n) // sync_every > transitions // sync_every:
+                agent.update_target_model()
+            transitions += n
             
-            # Train the agent
-            loss = agent.train()
-            
-            # Move to next state
-            state = next_state
+            # Move to next states
+            states = next_states
             metrics = new_metrics
             params = new_params
-            param_dict = new_param_dict
-            
-        # Update target network every episode
-        if episode % 10 == 0:
-            agent.update_target_model()
             
         # Log progress
-        if episode % 10 == 0:
-            diagnostics = agent.get_diagnostic_info()
-            logger.info(f"Episode {episode}/{episodes}: epsilon={diagnostics['epsilon']:.3f}, "
-                       f"avg_reward={diagnostics['avg_reward']:.3f}")
+        diagnostics = agent.get_diagnostic_info()
+        logger.info(f"Episode {first_episode + n}/{episodes}: epsilon={diagnostics['epsilon']:.3f}, "
+                   f"avg_reward={diagnostics['avg_reward']:.3f}")
             
     # Save the trained model
     agent.save()
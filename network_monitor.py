@@ -3,67 +3,117 @@ import time
 import logging
 import json
 import threading
+import queue
 import socket
-import subprocess
-from datetime import datetime, timedelta
-from collections import deque
+import functools
+from collections import namedtuple
+from dataclasses import dataclass, replace
+from operator import attrgetter
+from datetime import datetime
 import math
 import random
+import numpy as np
 
-# Try importing the necessary libraries (would need to be installed)
+# Try importing the necessary libraries (would need to be installed); the
+# mock implementations for development/testing are only loaded when missing
 try:
     import psutil
+except ImportError:
+    from _monitor_mocks import psutil
+
+try:
     import speedtest
 except ImportError:
-    # Mock implementations for development/testing
-    class psutil:
-        @staticmethod
-        def net_io_counters(pernic=False):
-            """Mock network IO counters"""
-            if pernic:
-                return {'eth0': psutil._NIC(0, 0, 0, 0, 0, 0)}
-            return psutil._NIC(1000000, 500000, 1000, 500, 0, 0)
-        
-        class _NIC:
-            def __init__(self, bytes_sent, bytes_recv, packets_sent, packets_recv, errin, errout):
-                self.bytes_sent = bytes_sent
-                self.bytes_recv = bytes_recv
-                self.packets_sent = packets_sent
-                self.packets_recv = packets_recv
-                self.errin = errin
-                self.errout = errout
-    
-    class speedtest:
-        class Speedtest:
-            def __init__(self):
-                pass
-                
-            def get_best_server(self):
-                return {"host": "test-server.net", "country": "Test Country"}
-                
-            def download(self):
-                return 1500000  # 1.5 Mbps
-                
-            def upload(self):
-                return 750000  # 0.75 Mbps
-                
-            def results(self):
-                return speedtest.SpeedtestResults()
-        
-        class SpeedtestResults:
-            def __init__(self):
-                self.dict = {
-                    "download": 1500000,
-                    "upload": 750000,
-                    "ping": 100,
-                    "server": {
-                        "host": "test-server.net",
-                        "country": "Test Country"
-                    }
-                }
+    from _monitor_mocks import speedtest
 
 logger = logging.getLogger(__name__)
 
+@dataclass(frozen=True, slots=True)
+class StatsSnapshot:
+    """Network statistics at one point in time"""
+    upload_rate: float = 0.0      # Upload throughput in bytes/s
+    download_rate: float = 0.0    # Download throughput in bytes/s
+    latency: float = 0.0          # Round-trip latency in ms
+    packet_loss: float = 0.0      # Packet loss in percent
+    bytes_sent: int = 0           # Interface bytes sent counter
+    bytes_received: int = 0       # Interface bytes received counter
+    tunnel_overhead: float = 0.0  # Estimated tunnel overhead in percent
+    ts_epoch: float = 0.0         # Unix time the snapshot was taken
+    
+    def to_json(self):
+        """
+        Convert the snapshot to its public form
+        
+        Returns:
+            dict: Stats with throughput in Mbps and an ISO 8601 'timestamp'
+        """
+        return {
+            # Convert to Mbps (megabits per second) only when read
+            'upload_speed': self.upload_rate * 8 / 1_000_000,
+            'download_speed': self.download_rate * 8 / 1_000_000,
+            'latency': self.latency,
+            'packet_loss': self.packet_loss,
+            'bytes_sent': self.bytes_sent,
+            'bytes_received': self.bytes_received,
+            'tunnel_overhead': self.tunnel_overhead,
+            'timestamp': datetime.fromtimestamp(self.ts_epoch).isoformat()
+        }
+
+# Counters of a single interface read from sysfs or /proc/net/dev,
+# attribute-compatible with what psutil.net_io_counters returns
+_ProcCounters = namedtuple('_ProcCounters', ['bytes_sent', 'bytes_recv', 'packets_sent', 'packets_recv'])
+
+# sysfs statistics files backing each `_ProcCounters` field, in field order
+_SYSFS_COUNTERS = ('tx_bytes', 'rx_bytes', 'tx_packets', 'rx_packets')
+
+# Largest increase read as a 32-bit counter wrap rather than a reset
+_COUNTER_WRAP_MARGIN = 1 << 30
+
+@functools.lru_cache(maxsize=256)
+def _getaddrinfo_memo(*args, **kwargs):
+    return tuple(socket.getaddrinfo(*args, **kwargs))
+
+class _SpeedtestSocket:
+    """
+    The socket module as speedtest-cli sees it: name lookups are memoized
+    
+    speedtest-cli resolves the server name on every request it makes, so a
+    slow resolver eats into the measured throughput. Only speedtest's own
+    `socket` global is replaced; the rest of the process is unaffected.
+    """
+    
+    @staticmethod
+    def getaddrinfo(*args, **kwargs):
+        return list(_getaddrinfo_memo(*args, **kwargs))
+    
+    @staticmethod
+    def create_connection(*args, **kwargs):
+        # speedtest's vendored copy resolves through its `socket` global, i.e. us
+        return speedtest.create_connection(*args, **kwargs)
+    
+    def __getattr__(self, name):
+        return getattr(socket, name)
+
+# The mock module has no sockets to redirect
+if hasattr(speedtest, 'create_connection'):
+    speedtest.socket = _SpeedtestSocket()
+
+# One row of stats history; fields in the same order as `StatsSnapshot`
+_HISTORY_DTYPE = np.dtype([
+    ('upload_rate', 'f8'),
+    ('download_rate', 'f8'),
+    ('latency', 'f8'),
+    ('packet_loss', 'f8'),
+    ('bytes_sent', 'i8'),
+    ('bytes_received', 'i8'),
+    ('tunnel_overhead', 'f8'),
+    ('ts_epoch', 'f8'),  # Unix time
+])
+
+# Reads a StatsSnapshot's fields as one history row; unlike dataclasses.astuple
+# it does not deep-copy each value
+_history_row = attrgetter(*_HISTORY_DTYPE.names)
+
 class NetworkMonitor:
     """
     Monitors network performance and collects statistics
@@ -77,26 +127,41 @@ class NetworkMonitor:
             stats_history_length (int): Number of historical stats entries to keep
         """
         self.interface_name = 'wg0'  # Default WireGuard interface name
-        self.current_stats = {
-            'upload_speed': 0,
-            'download_speed': 0,
-            'latency': 0,
-            'packet_loss': 0,
-            'bytes_sent': 0,
-            'bytes_received': 0,
-            'tunnel_overhead': 0,
-            'timestamp': datetime.now().isoformat()
-        }
         
-        # Queue to store historical stats
-        self.stats_history = deque(maxlen=stats_history_length)
+        # (interface name, file descriptors) of the open sysfs counter files
+        self._sysfs_fds = (None, ())
+        
+        # On Linux the tunnel counters are read straight from /proc/net/dev
+        self._proc_net_dev_path = '/proc/net/dev' if os.path.exists('/proc/net/dev') else None
+        
+        # (monotonic time, result) of the last tunnel interface check
+        self._tunnel_cache = (None, False)
+        
+        # Replaced as a whole on every update, so readers never see a partial one
+        self.current_stats = StatsSnapshot(ts_epoch=time.time())
+        
+        # Ring buffer of historical stats, one structured row per minute
+        self._hist = np.zeros(stats_history_length, dtype=_HISTORY_DTYPE)
+        # (row the next entry is written to, number of rows holding an entry),
+        # swapped as one tuple after the row is written
+        self._cursor = (0, 0)
         
         # Previous IO values for calculating rates
         self.prev_io = None
         self.prev_time = time.time()
         
+        # Last time a consumer read the current stats; throughput is only
+        # sampled every cycle while someone is watching
+        self._last_access = 0.0
+        
+        # Queues receiving a stats snapshot after every monitoring cycle
+        self._subscribers = []
+        
+        # Worker running the hourly speed test off the monitoring thread
+        self._speed_test_thread = None
+        
         # Start background monitoring thread
-        self.running = True
+        self._stop = threading.Event()
         self.monitor_thread = threading.Thread(target=self._monitor_loop)
         self.monitor_thread.daemon = True
         self.monitor_thread.start()
@@ -106,10 +171,17 @@ class NetworkMonitor:
         fast_counter = 0
         slow_counter = 0
         
-        while self.running:
+        # Cycles are scheduled against absolute deadlines so time spent
+        # measuring does not stretch the 5 second sampling period
+        next_deadline = time.time()
+        
+        while not self._stop.is_set():
             try:
-                # Update throughput stats (every 5 seconds)
-                self._update_throughput_stats()
+                # Update throughput stats (every 5 seconds while stats are being
+                # read, otherwise once a minute just before they are recorded)
+                if (fast_counter == 11 or self._subscribers or
+                        time.time() - self._last_access < 60):
+                    self._update_throughput_stats()
                 
                 fast_counter += 1
                 
@@ -121,7 +193,7 @@ class NetworkMonitor:
                     self._update_latency_stats()
                     
                     # Add current stats to history
-                    self.stats_history.append(self.current_stats.copy())
+                    self._record_history()
                     
                     slow_counter += 1
                 
@@ -129,135 +201,281 @@ class NetworkMonitor:
                 if slow_counter >= 60:
                     slow_counter = 0
                     
-                    # Run a speed test
-                    self._run_speed_test()
+                    # Run a speed test without stalling the 5 second cadence
+                    self._schedule_speed_test()
                 
-                # Sleep for 5 seconds
-                time.sleep(5)
+                # Publish one snapshot per cycle, however many subscribers there are
+                self._publish()
+                
+                next_deadline += 5.0
                 
             except Exception as e:
                 logger.error(f"Error in network monitoring loop: {e}")
-                time.sleep(10)  # Wait longer if there's an error
+                next_deadline = time.time() + 10.0  # Wait longer if there's an error
+            
+            # Skip missed cycles rather than running them back to back
+            now = time.time()
+            if next_deadline < now:
+                next_deadline = now
+            
+            # Wakes immediately when stop() is called
+            self._stop.wait(timeout=max(0, next_deadline - now))
+    
+    def _schedule_speed_test(self):
+        """Start a speed test in a worker thread unless one is still running"""
+        if self._speed_test_thread is None or not self._speed_test_thread.is_alive():
+            self._speed_test_thread = threading.Thread(target=self._run_speed_test, daemon=True)
+            self._speed_test_thread.start()
+    
+    def _publish(self):
+        """Push a snapshot of the current stats to every subscriber"""
+        if not self._subscribers:
+            return
+        
+        snapshot = self.current_stats.to_json()
+        for q in tuple(self._subscribers):
+            try:
+                q.put_nowait(snapshot)
+            except queue.Full:
+                pass  # Slow consumer; it keeps the snapshots it already has
+    
+    def subscribe(self, maxsize=16):
+        """
+        Subscribe to the stats snapshot published after each monitoring cycle
+        
+        Args:
+            maxsize (int): Number of snapshots buffered before new ones are dropped
+            
+        Returns:
+            queue.Queue: Queue the snapshots are delivered to
+        """
+        q = queue.Queue(maxsize=maxsize)
+        self._subscribers.append(q)
+        return q
     
-    def _update_throughput_stats(self):
-        """Update the current throughput statistics"""
+    def unsubscribe(self, q):
+        """
+        Stop delivering snapshots to a queue returned by `subscribe`
+        
+        Args:
+            q (queue.Queue): Subscribed queue
+        """
         try:
-            # Get current time for rate calculations
-            current_time = time.time()
-            time_diff = current_time - self.prev_time
+            self._subscribers.remove(q)
+        except ValueError:
+            pass
+    
+    def stop(self):
+        """Stop the background monitoring thread and wait for it to exit"""
+        self._stop.set()
+        self.monitor_thread.join()
+        self._close_sysfs_counters()
+    
+    def _record_history(self):
+        """Write a snapshot of the current stats to the history ring buffer"""
+        head, count = self._cursor
+        # The snapshot is immutable, so its fields are stored without a copy
+        self._hist[head] = _history_row(self.current_stats)
+        self._cursor = ((head + 1) % len(self._hist), min(count + 1, len(self._hist)))
+    
+    def _read_proc_net_dev(self):
+        """
+        Read the tunnel interface counters from /proc/net/dev
+        
+        Returns:
+            _ProcCounters: Counters of the interface, or None if it is not listed
+        """
+        with open(self._proc_net_dev_path) as f:
+            for line in f:
+                name, sep, data = line.partition(':')
+                if sep and name.strip() == self.interface_name:
+                    fields = data.split()
+                    # Receive bytes/packets come first, transmit bytes/packets at 8 and 9
+                    return _ProcCounters(int(fields[8]), int(fields[0]), int(fields[9]), int(fields[1]))
+        
+        return None
+    
+    def _close_sysfs_counters(self):
+        """Close the file descriptors of the sysfs counter files"""
+        for fd in self._sysfs_fds[1]:
+            os.close(fd)
+        self._sysfs_fds = (None, ())
+    
+    def _read_sysfs_counters(self):
+        """
+        Read the tunnel interface counters from /sys/class/net/<iface>/statistics
+        
+        The counter files are opened once and re-read in place with pread, so
+        a sample costs four small reads with no path lookup or table parsing.
+        
+        Returns:
+            _ProcCounters: Counters of the interface
+        """
+        name, fds = self._sysfs_fds
+        if name != self.interface_name:
+            self._close_sysfs_counters()
+            base = f'/sys/class/net/{self.interface_name}/statistics'
+            opened = []
+            try:
+                for counter in _SYSFS_COUNTERS:
+                    opened.append(os.open(os.path.join(base, counter), os.O_RDONLY))
+            except OSError:
+                for fd in opened:
+                    os.close(fd)
+                raise
+            fds = tuple(opened)
+            self._sysfs_fds = (self.interface_name, fds)
+        
+        try:
+            return _ProcCounters(*[int(os.pread(fd, 32, 0)) for fd in fds])
+        except OSError:
+            # The interface went away; reopen on the next sample
+            self._close_sysfs_counters()
+            raise
+    
+    def _read_io_counters(self):
+        """Read the IO counters of the tunnel interface, or of all interfaces"""
+        # Only the one interface's counters are read, instead of psutil
+        # building counters for every NIC on the host
+        if self._proc_net_dev_path is not None:
+            try:
+                return self._read_sysfs_counters()
+            except (OSError, ValueError):
+                pass  # No sysfs entry for the interface; try the text table
             
-            # Get IO counters
             try:
-                # Try to get WireGuard interface stats first
-                io_stats = psutil.net_io_counters(pernic=True).get(self.interface_name)
-                
-                # Fall back to total network stats if WireGuard interface not found
-                if io_stats is None:
-                    io_stats = psutil.net_io_counters(pernic=False)
-                    logger.debug(f"Could not find {self.interface_name} interface, using total network stats")
-            except Exception:
-                # Fall back to total network stats
+                io_stats = self._read_proc_net_dev()
+                if io_stats is not None:
+                    return io_stats
+            except (OSError, ValueError, IndexError) as e:
+                logger.debug(f"Could not read {self._proc_net_dev_path}: {e}")
+        
+        try:
+            # Try to get WireGuard interface stats first
+            io_stats = psutil.net_io_counters(pernic=True).get(self.interface_name)
+            
+            # Fall back to total network stats if WireGuard interface not found
+            if io_stats is None:
                 io_stats = psutil.net_io_counters(pernic=False)
+                logger.debug(f"Could not find {self.interface_name} interface, using total network stats")
+        except Exception:
+            # Fall back to total network stats
+            io_stats = psutil.net_io_counters(pernic=False)
+        
+        return io_stats
+    
+    @staticmethod
+    def _counter_delta(current, previous):
+        """
+        Difference between two readings of a monotonically increasing counter
+        
+        Args:
+            current (int): Latest counter reading
+            previous (int): Earlier counter reading
+            
+        Returns:
+            int: Increase of the counter, accounting for a wrap or reset in between
+        """
+        if current >= previous:
+            return current - previous
+        
+        # Only a 32-bit counter read just below 2**32 plausibly wrapped; any
+        # other decrease is a reset (interface recreated, NIC reset), after
+        # which the counter holds only what was counted since
+        wrapped = (current - previous) & 0xFFFFFFFF
+        if previous < (1 << 32) and wrapped <= _COUNTER_WRAP_MARGIN:
+            return wrapped
+        return current
+    
+    def _update_throughput_stats(self, interval=1.0):
+        """
+        Update the current throughput statistics
+        
+        Rates are computed from two counter samples: the one saved by the
+        previous update, or on the first call one taken `interval` seconds
+        before the current sample.
+        
+        Args:
+            interval (float): Seconds between the two samples on the first call
+        """
+        try:
+            if self.prev_io is None:
+                self.prev_io = self._read_io_counters()
+                self.prev_time = time.time()
+                if self._stop.wait(timeout=interval):
+                    return
+            
+            # Get current time and IO counters for rate calculations
+            io_stats = self._read_io_counters()
+            current_time = time.time()
+            time_diff = current_time - self.prev_time
             
-            # Calculate rates if we have previous values
-            if self.prev_io:
+            # Calculate rates from the two samples
+            if time_diff > 0:
                 # Calculate bytes/sec
-                bytes_sent_rate = (io_stats.bytes_sent - self.prev_io.bytes_sent) / time_diff
-                bytes_recv_rate = (io_stats.bytes_recv - self.prev_io.bytes_recv) / time_diff
-                
-                # Convert to Mbps (megabits per second)
-                upload_mbps = (bytes_sent_rate * 8) / 1_000_000
-                download_mbps = (bytes_recv_rate * 8) / 1_000_000
-                
-                # Update current stats
-                self.current_stats['upload_speed'] = upload_mbps
-                self.current_stats['download_speed'] = download_mbps
-                self.current_stats['bytes_sent'] = io_stats.bytes_sent
-                self.current_stats['bytes_received'] = io_stats.bytes_recv
+                bytes_sent_rate = self._counter_delta(io_stats.bytes_sent, self.prev_io.bytes_sent) / time_diff
+                bytes_recv_rate = self._counter_delta(io_stats.bytes_recv, self.prev_io.bytes_recv) / time_diff
                 
                 # Calculate estimated overhead (WireGuard adds about 20-60 bytes per packet)
                 avg_packet_size = 1500  # Typical MTU
                 wireguard_overhead_bytes = 60  # Approximate overhead per packet
+                overhead_percentage = self.current_stats.tunnel_overhead
                 if io_stats.packets_sent > 0:
                     overhead_percentage = (wireguard_overhead_bytes / avg_packet_size) * 100
-                    self.current_stats['tunnel_overhead'] = overhead_percentage
+                
+                # Update current stats
+                self.current_stats = replace(
+                    self.current_stats,
+                    upload_rate=bytes_sent_rate,
+                    download_rate=bytes_recv_rate,
+                    bytes_sent=io_stats.bytes_sent,
+                    bytes_received=io_stats.bytes_recv,
+                    tunnel_overhead=overhead_percentage,
+                    ts_epoch=current_time
+                )
+            else:
+                # Update timestamp
+                self.current_stats = replace(self.current_stats, ts_epoch=current_time)
             
             # Save current values for next comparison
             self.prev_io = io_stats
             self.prev_time = current_time
             
-            # Update timestamp
-            self.current_stats['timestamp'] = datetime.now().isoformat()
-            
         except Exception as e:
             logger.error(f"Error updating throughput stats: {e}")
     
+    def _is_tunnel_active(self):
+        """
+        Check whether the WireGuard interface is up, caching the answer for 60 seconds
+        
+        Returns:
+            bool: True if the tunnel interface exists
+        """
+        checked_at, active = self._tunnel_cache
+        now = time.monotonic()
+        if checked_at is not None and now - checked_at < 60:
+            return active
+        
+        try:
+            if os.path.isdir('/sys/class/net'):
+                # Linux: every interface has a directory here
+                active = os.path.isdir(f'/sys/class/net/{self.interface_name}')
+            else:
+                active = self.interface_name in psutil.net_if_stats()
+        except Exception:
+            active = False
+        
+        self._tunnel_cache = (now, active)
+        return active
+    
     def _update_latency_stats(self):
         """Measure and update latency and packet loss statistics"""
         try:
-            # Function to ping a host and measure latency and packet loss
-            def ping_host(host, count=10):
-                try:
-                    # Check if ping command exists
-                    which_result = subprocess.run(['which', 'ping'], 
-                                                capture_output=True, 
-                                                text=True)
-                    if which_result.returncode != 0:
-                        logger.warning("Ping command not found, using simulated ping")
-                        raise FileNotFoundError("ping command not found")
-                        
-                    # Run ping command
-                    if os.name == 'nt':  # Windows
-                        cmd = ['ping', '-n', str(count), host]
-                    else:  # Linux/Mac
-                        cmd = ['ping', '-c', str(count), host]
-                    
-                    result = subprocess.run(cmd, capture_output=True, text=True)
-                    
-                    # Parse output to extract latency and packet loss
-                    if result.returncode == 0:
-                        output = result.stdout
-                        
-                        # Extract packet loss
-                        loss_match = None
-                        if os.name == 'nt':  # Windows
-                            loss_match = re.search(r'(\d+)% loss', output)
-                        else:  # Linux/Mac
-                            loss_match = re.search(r'(\d+)% packet loss', output)
-                        
-                        packet_loss = float(loss_match.group(1)) if loss_match else 0
-                        
-                        # Extract average latency
-                        latency_match = None
-                        if os.name == 'nt':  # Windows
-                            latency_match = re.search(r'Average = (\d+)ms', output)
-                        else:  # Linux/Mac
-                            latency_match = re.search(r'min/avg/max/.+ = [\d.]+/([\d.]+)/', output)
-                        
-                        latency = float(latency_match.group(1)) if latency_match else 0
-                        
-                        return {'latency': latency, 'packet_loss': packet_loss}
-                    
-                    return {'latency': 0, 'packet_loss': 100}  # If ping failed
-                    
-                except Exception as e:
-                    logger.error(f"Error pinging host {host}: {e}")
-                    return {'latency': 0, 'packet_loss': 100}
-            
             # For development/testing environments, use simulated values
-            import random
-            import re
-            
             # Always use simulated values for consistent behavior
             # Generate realistic values based on whether the tunnel is active or not
             try:
-                is_tunnel_active = False
-                try:
-                    # Check if there's a WireGuard process running
-                    ps_result = subprocess.run(['ps', 'aux'], capture_output=True, text=True)
-                    is_tunnel_active = 'wireguard' in ps_result.stdout.lower() or 'wg-quick' in ps_result.stdout.lower()
-                except:
-                    pass
+                is_tunnel_active = self._is_tunnel_active()
                 
                 if is_tunnel_active:
                     # Better performance with tunnel
@@ -281,8 +499,11 @@ class NetworkMonitor:
                 }
             
             # Update current stats
-            self.current_stats['latency'] = result['latency']
-            self.current_stats['packet_loss'] = result['packet_loss']
+            self.current_stats = replace(
+                self.current_stats,
+                latency=result['latency'],
+                packet_loss=result['packet_loss']
+            )
             
         except Exception as e:
             logger.error(f"Error updating latency stats: {e}")
@@ -292,9 +513,13 @@ class NetworkMonitor:
         try:
             logger.info("Starting speed test")
             
+            # Resolve afresh once per run; repeats within the run are memoized
+            _getaddrinfo_memo.cache_clear()
+            
             # First try to check if we can import the speedtest module properly
             try:
                 # Check if speedtest-cli is properly installed and working
+                # (this also fetches its config, priming the resolver cache)
                 st = speedtest.Speedtest()
                 st.get_best_server()
                 
@@ -325,16 +550,8 @@ class NetworkMonitor:
                 # Fall through to simulation
             
             # If we reach here, we need to simulate speed test results
-            import random
-            
             # Check if tunnel is active to generate appropriate speeds
-            is_tunnel_active = False
-            try:
-                # Check if there's a WireGuard process running
-                ps_result = subprocess.run(['ps', 'aux'], capture_output=True, text=True)
-                is_tunnel_active = 'wireguard' in ps_result.stdout.lower() or 'wg-quick' in ps_result.stdout.lower()
-            except:
-                pass
+            is_tunnel_active = self._is_tunnel_active()
                 
             if is_tunnel_active:
                 # Better performance with tunnel (up to 20x improvement)
@@ -379,10 +596,16 @@ class NetworkMonitor:
         """
         Get the current network statistics
         
+        This only converts the snapshot collected by the monitoring thread
+        and never reads the network counters itself. The monitoring thread
+        replaces the snapshot with a single attribute assignment, so no lock
+        is needed to see a consistent set of values.
+        
         Returns:
             dict: Current network statistics
         """
-        return self.current_stats
+        self._last_access = time.time()
+        return self.current_stats.to_json()
     
     def get_stats_history(self, hours=1):
         """
@@ -394,20 +617,29 @@ class NetworkMonitor:
         Returns:
             list: Historical network statistics
         """
-        if not self.stats_history:
+        # The monitor thread keeps writing the ring, so read a copy of it
+        hist = self._hist.copy()
+        count = self._cursor[1]
+        if not count:
             return []
         
-        # Calculate cutoff time
-        cutoff_time = datetime.now() - timedelta(hours=hours)
+        # Entries in arrival order as up to two ascending segments, oldest
+        # first; once the ring is full the oldest row is found in the copy
+        # itself, so a row written after the cursor was read can't leave a
+        # segment unsorted
+        if count < len(hist):
+            segments = (hist[:count],)
+        else:
+            head = int(np.argmin(hist['ts_epoch']))
+            segments = (hist[head:], hist[:head])
         
-        # Filter stats by timestamp
-        filtered_stats = []
-        for stat in self.stats_history:
-            try:
-                stat_time = datetime.fromisoformat(stat['timestamp'])
-                if stat_time >= cutoff_time:
-                    filtered_stats.append(stat)
-            except (ValueError, KeyError):
-                continue
+        # Timestamps are ascending, so the cutoff is a binary search; only the
+        # rows after it are copied
+        cutoff = time.time() - hours * 3600
+        recent = []
+        for segment in segments:
+            start = np.searchsorted(segment['ts_epoch'], cutoff, side='left')
+            recent.extend(segment[start:].tolist())
         
-        return filtered_stats
+        # Convert to dicts only here, at the API boundary
+        return [StatsSnapshot(*row).to_json() for row in recent]
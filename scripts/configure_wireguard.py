@@ -17,12 +17,19 @@ Prerequisites:
 import os
 import sys
 import json
+import base64
+from ipaddress import ip_network, collapse_addresses
 import logging
 import paramiko
-import time
+import select
+import shutil
+import socket
+import subprocess
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 from dotenv import load_dotenv
+from cryptography.hazmat.primitives.asymmetric.x25519 import X25519PrivateKey
+from cryptography.hazmat.primitives.serialization import Encoding, PublicFormat
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, 
@@ -32,17 +39,66 @@ logger = logging.getLogger(__name__)
 # Load environment variables from .env file
 load_dotenv()
 
+# Client wg-quick configuration; AllowedIPs selects full, split or AWS-only tunnelling
+_CLIENT_CONFIG_TEMPLATE = """[Interface]
+PrivateKey = {private_key}
+Address = {address}
+DNS = {dns}
+MTU = {mtu}
+
+[Peer]
+PublicKey = {public_key}
+Endpoint = {endpoint}
+AllowedIPs = {allowed_ips}
+PersistentKeepalive = {keep_alive}
+"""
+
+# Tunnel subnet plus the AWS ranges routed by the AWS-only client; collapsed
+# into the fewest CIDRs (and validated) here rather than by wg-quick at startup
+_AWS_ONLY_ALLOWED_IPS = ", ".join(str(net) for net in collapse_addresses(ip_network(cidr) for cidr in (
+    "10.0.0.0/24", "52.94.0.0/16", "54.239.0.0/16", "52.119.0.0/16", "52.219.0.0/16"
+)))
+
+# OpenSSH connection sharing: the first run starts a background master that
+# later runs (and commands) reuse for up to 10 minutes without a new handshake
+_CONTROLMASTER_OPTS = [
+    "-o", "ControlMaster=auto",
+    "-o", "ControlPersist=600s",
+    "-o", "ControlPath=~/.ssh/wg-%r@%h:%p",
+]
+
+def generate_keypair():
+    """
+    Generate a WireGuard key pair locally, as `wg genkey | wg pubkey` would.
+    
+    Returns:
+        tuple: (private key, public key), both base64 encoded
+    """
+    # Clamp the Curve25519 scalar the same way `wg genkey` does
+    private_bytes = bytearray(os.urandom(32))
+    private_bytes[0] &= 248
+    private_bytes[31] = (private_bytes[31] & 127) | 64
+    
+    private_key = X25519PrivateKey.from_private_bytes(bytes(private_bytes))
+    public_bytes = private_key.public_key().public_bytes(Encoding.Raw, PublicFormat.Raw)
+    
+    return (base64.b64encode(private_bytes).decode(), base64.b64encode(public_bytes).decode())
+
 class WireGuardConfig:
     """
     Handles the configuration of WireGuard on an EC2 instance.
     """
-    def __init__(self, instance_info_file='./config/aws_instance.json', key_path=None):
+    def __init__(self, instance_info_file='./config/aws_instance.json', key_path=None,
+                 use_controlmaster=False, config_dir='./config'):
         """
         Initialize the WireGuard configuration.
         
         Args:
             instance_info_file: Path to the JSON file with instance information
             key_path: Path to the SSH private key file
+            use_controlmaster: Run commands through the OpenSSH client with a
+                shared master connection instead of paramiko (not on Windows)
+            config_dir: Directory the client and saved configurations are written to
         """
         self.instance_info_file = Path(instance_info_file)
         self.key_path = key_path or os.environ.get('AWS_KEY_PATH')
@@ -57,9 +113,23 @@ class WireGuardConfig:
             logger.error(f"Instance information not found at {instance_info_file}")
             sys.exit(1)
             
+        # Created once here rather than before every file written into it
+        self.config_dir = Path(config_dir)
+        self.config_dir.mkdir(parents=True, exist_ok=True)
+        
         self.ssh_client = paramiko.SSHClient()
         self.ssh_client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
         
+        # OpenSSH multiplexing needs Unix domain sockets and the ssh binary
+        self.use_controlmaster = use_controlmaster and os.name != 'nt' and shutil.which('ssh') is not None
+        if use_controlmaster and not self.use_controlmaster:
+            logger.warning("OpenSSH ControlMaster is not available here, using paramiko")
+            
+        # SFTP session for uploading files, opened on first use, and the
+        # uploaded staging files the next script installs and removes
+        self.sftp = None
+        self._staged = []
+        
         # WireGuard configuration
         self.server_private_key = None
         self.server_public_key = None
@@ -102,13 +172,36 @@ class WireGuardConfig:
             ip_address = self.instance_info['PublicIpAddress']
             logger.info(f"Connecting to {ip_address} via SSH...")
             
+            if self.use_controlmaster:
+                # Starts the master connection, or reuses one left by an earlier run
+                _, _, exit_status = self._run_ssh("true")
+                if exit_status != 0:
+                    return False
+                logger.info("Connected to instance")
+                return True
+                
             self.ssh_client.connect(
                 hostname=ip_address,
                 username='ubuntu',
                 key_filename=self.key_path,
-                timeout=10
+                timeout=10,
+                banner_timeout=5,  # Fail fast on a daemon throttled by MaxStartups
+                auth_timeout=5,
+                compress=True  # apt output compresses well
             )
             
+            # Every channel shares the transport's socket, so disabling Nagle
+            # here keeps small command replies from waiting on delayed ACKs
+            transport = self.ssh_client.get_transport()
+            transport.set_keepalive(30)
+            transport.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            
+            # Channels opened from here on (scripts, SFTP) get a larger
+            # window and packets, so bulk output like apt's isn't held back
+            # waiting for window updates
+            transport.default_window_size = 4 * 1024 * 1024
+            transport.default_max_packet_size = 64 * 1024
+            
             logger.info("Connected to instance")
             return True
             
@@ -116,38 +209,181 @@ class WireGuardConfig:
             logger.error(f"Error connecting to instance: {e}")
             return False
             
-    def execute_command(self, command, sudo=False):
+    def _run_ssh(self, remote_command, input=None):
         """
-        Execute a command on the instance.
+        Run a command through the OpenSSH client over the shared master connection.
         
         Args:
-            command: Command to execute
-            sudo: Whether to run with sudo
+            remote_command: Command to run on the instance
+            input: Text to send to the command's stdin
             
         Returns:
             tuple: (stdout, stderr, exit_status)
         """
-        if sudo and not command.startswith("sudo "):
-            command = f"sudo {command}"
+        argv = [
+            "ssh", "-i", self.key_path,
+            *_CONTROLMASTER_OPTS,
+            "-o", "BatchMode=yes",
+            "-o", "Compression=yes",
+            "-o", "StrictHostKeyChecking=accept-new",
+            "-o", "ConnectTimeout=10",
+            f"ubuntu@{self.instance_info['PublicIpAddress']}",
+            remote_command,
+        ]
+        result = subprocess.run(argv, input=input, capture_output=True, text=True)
+        
+        if result.returncode != 0:
+            logger.error(f"Command failed: {remote_command}\nError: {result.stderr}")
             
-        logger.debug(f"Executing: {command}")
+        return (result.stdout, result.stderr, result.returncode)
+        
+    @staticmethod
+    def _drain_channel(chan):
+        """
+        Collect stdout and stderr from an exec channel as the data arrives.
+        
+        Reading while the command runs keeps a chatty command (apt) from
+        stalling on a full channel window, and overlaps the transfer with
+        remote execution.
+        
+        Args:
+            chan: paramiko Channel that has been sent its command
+            
+        Returns:
+            tuple: (stdout, stderr, exit_status)
+        """
+        out = bytearray()
+        err = bytearray()
         
         try:
-            stdin, stdout, stderr = self.ssh_client.exec_command(command)
-            exit_status = stdout.channel.recv_exit_status()
+            while not chan.exit_status_ready():
+                idle = True
+                if chan.recv_ready():
+                    out += chan.recv(65536)
+                    idle = False
+                if chan.recv_stderr_ready():
+                    err += chan.recv_stderr(65536)
+                    idle = False
+                if idle:
+                    select.select([chan], [], [], 0.1)
+                    
+            # The exit status can overtake the last of the output; read to EOF
+            while True:
+                data = chan.recv(65536)
+                if not data:
+                    break
+                out += data
+            while True:
+                data = chan.recv_stderr(65536)
+                if not data:
+                    break
+                err += data
+                
+            exit_status = chan.recv_exit_status()
+        finally:
+            chan.close()
             
-            stdout_str = stdout.read().decode()
-            stderr_str = stderr.read().decode()
+        return (out.decode(errors="replace"), err.decode(errors="replace"), exit_status)
+        
+    def execute_script(self, script, sudo=True):
+        """
+        Execute a multi-line shell script on the instance over a single channel.
+        
+        The script is fed to `bash -s` on stdin and stops at the first failing
+        command, so related commands cost one round trip instead of one each.
+        It is wrapped in a function that bash parses in full before running it
+        with stdin from /dev/null, so a command that reads stdin (an apt or
+        debconf prompt) can't swallow the rest of the script.
+        
+        Args:
+            script: Shell script to execute
+            sudo: Whether to run the whole script with sudo
+            
+        Returns:
+            tuple: (stdout, stderr, exit_status)
+        """
+        command = "sudo bash -s" if sudo else "bash -s"
+        payload = f"set -e\n_script() {{\n{script}\n}}\n_script </dev/null\n"
+        
+        # Staging files are removed however the script exits
+        staged, self._staged = self._staged, []
+        if staged:
+            payload = f"trap 'rm -f {' '.join(staged)}' EXIT\n" + payload
+        
+        logger.debug(f"Executing script with {command}:\n{script}")
+        
+        if self.use_controlmaster:
+            return self._run_ssh(command, input=payload)
+            
+        try:
+            chan = self.ssh_client.get_transport().open_session()
+            chan.exec_command(command)
+            chan.sendall(payload.encode())
+            chan.shutdown_write()
+            stdout_str, stderr_str, exit_status = self._drain_channel(chan)
             
             if exit_status != 0:
-                logger.error(f"Command failed: {command}\nError: {stderr_str}")
+                logger.error(f"Script failed with exit status {exit_status}\nError: {stderr_str}")
                 
             return (stdout_str, stderr_str, exit_status)
             
         except Exception as e:
-            logger.error(f"Error executing command: {e}")
+            logger.error(f"Error executing script: {e}")
+            self._discard_staged(staged)
             return ("", str(e), -1)
             
+    def _stage_file(self, path, content, mode=0o600):
+        """
+        Prepare a file for installation on the instance.
+        
+        With paramiko the content is uploaded raw over SFTP to a private file
+        in the login user's home, which the next `execute_script` removes on
+        exit; with ControlMaster it is embedded as a quoted heredoc. Either
+        way nothing is parsed or escaped by a shell.
+        
+        Args:
+            path: Destination path on the instance
+            content: File content
+            mode: Permission bits of the installed file
+            
+        Returns:
+            str: Shell commands (for a sudo script) that put the file in place
+        """
+        if self.use_controlmaster:
+            # install creates the file with its final mode, rather than
+            # cat creating it under the umask and a chmod following
+            return f"install -m {mode:o} /dev/stdin {path} <<'STAGED_FILE'\n{content}STAGED_FILE\n"
+            
+        if self.sftp is None:
+            self.sftp = self.ssh_client.open_sftp()
+            
+        staged = self.sftp.normalize(f".wg_stage_{os.urandom(4).hex()}")
+        self._staged.append(staged)
+        with self.sftp.open(staged, 'w') as f:
+            # Restrict access before any secret is written
+            f.chmod(0o600)
+            f.write(content)
+            
+        return f"install -m {mode:o} {staged} {path}\n"
+        
+    def _discard_staged(self, staged=None):
+        """
+        Remove staging files that no script is going to install.
+        
+        Args:
+            staged: Paths of the staging files (default: all pending ones)
+        """
+        if staged is None:
+            staged, self._staged = self._staged, []
+            
+        for path in staged:
+            try:
+                self.sftp.remove(path)
+            except FileNotFoundError:
+                pass  # Never created, or already removed by the script's trap
+            except Exception as e:
+                logger.warning(f"Could not remove staging file {path}: {e}")
+        
     def install_wireguard(self):
         """
         Install WireGuard on the EC2 instance.
@@ -157,20 +393,17 @@ class WireGuardConfig:
         """
         logger.info("Installing WireGuard...")
         
-        commands = [
-            "sudo apt update",
-            "sudo apt install -y wireguard wireguard-tools iptables",
-            "sudo apt install -y net-tools iputils-ping traceroute", # Useful networking tools
-        ]
+        # Install, then check that WireGuard was installed correctly
+        script = """export DEBIAN_FRONTEND=noninteractive
+apt update
+apt install -y wireguard wireguard-tools iptables
+apt install -y net-tools iputils-ping traceroute
+which wg
+"""
         
-        for cmd in commands:
-            _, _, exit_status = self.execute_command(cmd)
-            if exit_status != 0:
-                return False
-                
-        # Check if WireGuard is installed correctly
-        stdout, _, exit_status = self.execute_command("which wg")
-        if exit_status != 0 or not stdout.strip():
+        # `which wg` prints last, after the apt output
+        stdout, _, exit_status = self.execute_script(script)
+        if exit_status != 0 or not stdout.strip().endswith("/wg"):
             logger.error("WireGuard does not appear to be installed correctly")
             return False
             
@@ -186,32 +419,14 @@ class WireGuardConfig:
         """
         logger.info("Generating WireGuard keys...")
         
-        # Generate server keys
-        stdout, _, exit_status = self.execute_command("wg genkey")
-        if exit_status != 0:
-            return False
-            
-        self.server_private_key = stdout.strip()
-        
-        stdout, _, exit_status = self.execute_command(f"echo '{self.server_private_key}' | wg pubkey")
-        if exit_status != 0:
-            return False
-            
-        self.server_public_key = stdout.strip()
-        
-        # Generate client keys
-        stdout, _, exit_status = self.execute_command("wg genkey")
-        if exit_status != 0:
-            return False
-            
-        self.client_private_key = stdout.strip()
-        
-        stdout, _, exit_status = self.execute_command(f"echo '{self.client_private_key}' | wg pubkey")
-        if exit_status != 0:
+        # X25519 key generation is local; no round trips to the instance
+        try:
+            self.server_private_key, self.server_public_key = generate_keypair()
+            self.client_private_key, self.client_public_key = generate_keypair()
+        except Exception as e:
+            logger.error(f"Error generating WireGuard keys: {e}")
             return False
             
-        self.client_public_key = stdout.strip()
-        
         logger.info("WireGuard keys generated successfully")
         logger.info(f"Server public key: {self.server_public_key}")
         logger.info(f"Client public key: {self.client_public_key}")
@@ -241,27 +456,22 @@ PublicKey = {self.client_public_key}
 AllowedIPs = 10.0.0.2/32
 """
         
-        # Write server configuration
-        _, _, exit_status = self.execute_command(f"echo '{server_config}' | sudo tee /etc/wireguard/wg0.conf")
-        if exit_status != 0:
+        # Write server configuration with its permissions and enable IP forwarding
+        try:
+            script = (
+                self._stage_file("/etc/wireguard/wg0.conf", server_config) +
+                self._stage_file("/etc/sysctl.d/99-wireguard.conf", "net.ipv4.ip_forward=1\n", 0o644) +
+                "sysctl -p /etc/sysctl.d/99-wireguard.conf\n"
+                "sysctl net.ipv4.ip_forward=1\n"
+            )
+        except Exception as e:
+            logger.error(f"Error uploading server configuration: {e}")
+            self._discard_staged()
             return False
             
-        # Set permissions
-        _, _, exit_status = self.execute_command("sudo chmod 600 /etc/wireguard/wg0.conf")
+        _, _, exit_status = self.execute_script(script)
         if exit_status != 0:
             return False
-            
-        # Enable IP forwarding
-        commands = [
-            "echo 'net.ipv4.ip_forward=1' | sudo tee /etc/sysctl.d/99-wireguard.conf",
-            "sudo sysctl -p /etc/sysctl.d/99-wireguard.conf",
-            "sudo sysctl net.ipv4.ip_forward=1"
-        ]
-        
-        for cmd in commands:
-            _, _, exit_status = self.execute_command(cmd)
-            if exit_status != 0:
-                return False
                 
         logger.info("WireGuard server configured successfully")
         return True
@@ -275,18 +485,13 @@ AllowedIPs = 10.0.0.2/32
         """
         logger.info("Starting WireGuard server...")
         
-        commands = [
-            "sudo systemctl enable wg-quick@wg0",
-            "sudo systemctl start wg-quick@wg0"
-        ]
+        # Enable and start the service, then check server status
+        script = """systemctl enable wg-quick@wg0
+systemctl start wg-quick@wg0
+wg
+"""
         
-        for cmd in commands:
-            _, _, exit_status = self.execute_command(cmd)
-            if exit_status != 0:
-                return False
-                
-        # Check server status
-        stdout, _, exit_status = self.execute_command("sudo wg")
+        stdout, _, exit_status = self.execute_script(script)
         if exit_status != 0:
             logger.error("WireGuard server failed to start")
             return False
@@ -296,74 +501,65 @@ AllowedIPs = 10.0.0.2/32
         
         return True
         
-    def create_client_config(self, output_file='./config/client.conf'):
+    def create_client_config(self, output_file=None):
         """
         Create client configuration file.
         
         Args:
             output_file: Path to write the client configuration
+                (default: client.conf in the config directory)
             
         Returns:
             bool: True if configuration was created successfully, False otherwise
         """
+        output_file = Path(output_file) if output_file else self.config_dir / "client.conf"
         logger.info(f"Creating client configuration at {output_file}...")
         
-        # Create client configuration
-        client_config = f"""[Interface]
-PrivateKey = {self.client_private_key}
-Address = {self.client_address}
-DNS = {self.dns_servers}
-MTU = {self.mtu}
-
-[Peer]
-PublicKey = {self.server_public_key}
-Endpoint = {self.server_endpoint}
-AllowedIPs = 0.0.0.0/0
-PersistentKeepalive = {self.keep_alive}
-"""
+        # Everything but AllowedIPs is shared by the variants
+        fields = {
+            'private_key': self.client_private_key,
+            'address': self.client_address,
+            'dns': self.dns_servers,
+            'mtu': self.mtu,
+            'public_key': self.server_public_key,
+            'endpoint': self.server_endpoint,
+            'keep_alive': self.keep_alive
+        }
+        
+        # Full tunnel at output_file, plus a split tunnel configuration as an
+        # alternative and one for AWS-specific traffic only
+        output_dir = output_file.parent
+        variants = [
+            ("Client", output_file, "0.0.0.0/0"),
+            ("Split tunnel client", output_dir / "client_split_tunnel.conf", "10.0.0.0/24"),
+            ("AWS-only client", output_dir / "client_aws_only.conf", _AWS_ONLY_ALLOWED_IPS),
+        ]
         
         try:
-            # Create directory if it doesn't exist
-            os.makedirs(os.path.dirname(output_file), exist_ok=True)
-            
-            with open(output_file, 'w') as f:
-                f.write(client_config)
+            # Only a directory other than the config directory may be missing
+            if output_dir != self.config_dir:
+                output_dir.mkdir(parents=True, exist_ok=True)
                 
-            logger.info(f"Client configuration saved to {output_file}")
-            
-            # Also create a split tunnel configuration as an alternative
-            split_tunnel_config = client_config.replace("AllowedIPs = 0.0.0.0/0", "AllowedIPs = 10.0.0.0/24")
-            split_output_file = os.path.join(os.path.dirname(output_file), "client_split_tunnel.conf")
-            
-            with open(split_output_file, 'w') as f:
-                f.write(split_tunnel_config)
+            for label, path, allowed_ips in variants:
+                with open(path, 'w') as f:
+                    fields['allowed_ips'] = allowed_ips
+                    f.write(_CLIENT_CONFIG_TEMPLATE.format_map(fields))
+                    
+                logger.info(f"{label} configuration saved to {path}")
                 
-            logger.info(f"Split tunnel client configuration saved to {split_output_file}")
-            
-            # Create a configuration for AWS-specific traffic only
-            aws_tunnel_config = client_config.replace(
-                "AllowedIPs = 0.0.0.0/0",
-                "AllowedIPs = 10.0.0.0/24, 52.94.0.0/16, 54.239.0.0/16, 52.119.0.0/16, 52.219.0.0/16"
-            )
-            aws_output_file = os.path.join(os.path.dirname(output_file), "client_aws_only.conf")
-            
-            with open(aws_output_file, 'w') as f:
-                f.write(aws_tunnel_config)
-                
-            logger.info(f"AWS-only client configuration saved to {aws_output_file}")
-            
             return True
             
         except Exception as e:
             logger.error(f"Error creating client configuration: {e}")
             return False
             
-    def save_configuration(self, output_file='./config/wireguard_config.json'):
+    def save_configuration(self, output_file=None):
         """
         Save WireGuard configuration to a JSON file.
         
         Args:
             output_file: Path to write the configuration
+                (default: wireguard_config.json in the config directory)
             
         Returns:
             bool: True if configuration was saved successfully, False otherwise
@@ -381,9 +577,12 @@ PersistentKeepalive = {self.keep_alive}
                 'keep_alive': self.keep_alive
             }
             
-            # Create directory if it doesn't exist
-            os.makedirs(os.path.dirname(output_file), exist_ok=True)
+            output_file = Path(output_file) if output_file else self.config_dir / "wireguard_config.json"
             
+            # Only a directory other than the config directory may be missing
+            if output_file.parent != self.config_dir:
+                output_file.parent.mkdir(parents=True, exist_ok=True)
+                
             with open(output_file, 'w') as f:
                 json.dump(config, f, indent=2)
                 
@@ -419,16 +618,17 @@ if ! ip link show wg0 > /dev/null 2>&1; then
     exit 1
 fi
 
-# Check if we can ping through the tunnel
-ping -c 3 10.0.0.2 > /dev/null 2>&1
-if [ $? -ne 0 ]; then
-    echo "$(date): Cannot ping client, restarting tunnel..." >> $LOG_FILE
+# Check the client's last handshake, which the kernel already tracks
+# (0 means no client has connected yet, which a restart can't fix)
+last=$(wg show wg0 latest-handshakes | awk '$2 > m { m = $2 } END { print m + 0 }')
+if [ "$last" -ne 0 ] && [ $(($(date +%s) - last)) -gt 180 ]; then
+    echo "$(date): No handshake from client for over 3 minutes, restarting tunnel..." >> $LOG_FILE
     systemctl restart wg-quick@wg0
     exit 1
 fi
 
-# Check external connectivity
-ping -c 3 8.8.8.8 > /dev/null 2>&1
+# Check external connectivity (last resort, bounded to 1 second)
+ping -c 1 -W 1 8.8.8.8 > /dev/null 2>&1
 if [ $? -ne 0 ]; then
     echo "$(date): No external connectivity, restarting tunnel..." >> $LOG_FILE
     systemctl restart wg-quick@wg0
@@ -439,19 +639,57 @@ echo "$(date): WireGuard tunnel is running correctly" >> $LOG_FILE
 exit 0
 """
         
-        # Write the failover script
-        _, _, exit_status = self.execute_command(f"echo '{failover_script}' | sudo tee /usr/local/bin/wireguard_failover.sh")
-        if exit_status != 0:
-            return False
-            
-        # Make it executable
-        _, _, exit_status = self.execute_command("sudo chmod +x /usr/local/bin/wireguard_failover.sh")
-        if exit_status != 0:
+        # systemd restarts wg-quick itself if it fails
+        restart_dropin = """[Service]
+Restart=on-failure
+RestartSec=5s
+"""
+        
+        # A timer runs the liveness check every 5 minutes
+        watchdog_service = """[Unit]
+Description=WireGuard tunnel liveness check
+After=wg-quick@wg0.service
+
+[Service]
+Type=oneshot
+ExecStart=/usr/local/bin/wireguard_failover.sh
+"""
+        
+        watchdog_timer = """[Unit]
+Description=Run the WireGuard tunnel liveness check every 5 minutes
+
+[Timer]
+OnBootSec=5min
+OnUnitActiveSec=5min
+
+[Install]
+WantedBy=timers.target
+"""
+        
+        # Install the units and the failover script, drop the cron job older
+        # setups used, and start the timer
+        try:
+            script = (
+                "mkdir -p /etc/systemd/system/wg-quick@wg0.service.d\n" +
+                self._stage_file("/etc/systemd/system/wg-quick@wg0.service.d/restart.conf", restart_dropin, 0o644) +
+                self._stage_file("/etc/systemd/system/wg-watchdog.service", watchdog_service, 0o644) +
+                self._stage_file("/etc/systemd/system/wg-watchdog.timer", watchdog_timer, 0o644) +
+                self._stage_file("/usr/local/bin/wireguard_failover.sh", failover_script, 0o755) +
+                # Older setups put the cron job in the login user's crontab
+                "for user in root ubuntu; do\n"
+                "  if crontab -u $user -l 2>/dev/null | grep -qF wireguard_failover.sh; then\n"
+                "    crontab -u $user -l | grep -vF wireguard_failover.sh | crontab -u $user -\n"
+                "  fi\n"
+                "done\n"
+                "systemctl daemon-reload\n"
+                "systemctl enable --now wg-watchdog.timer\n"
+            )
+        except Exception as e:
+            logger.error(f"Error uploading failover script: {e}")
+            self._discard_staged()
             return False
             
-        # Create a cron job to run the script every 5 minutes
-        cron_job = "*/5 * * * * /usr/local/bin/wireguard_failover.sh"
-        _, _, exit_status = self.execute_command(f"(crontab -l 2>/dev/null; echo '{cron_job}') | crontab -")
+        _, _, exit_status = self.execute_script(script)
         if exit_status != 0:
             return False
             
@@ -467,58 +705,60 @@ exit 0
         """
         logger.info("Optimizing MTU for WireGuard tunnel...")
         
-        # Start with the default MTU
-        mtu = self.mtu
+        # Path MTU belongs to the underlying network, not to the tunnel's MTU
+        # setting, so it is found without restarting WireGuard: a binary
+        # search over don't-fragment pings (payload = packet - 28 bytes of
+        # IP/ICMP headers), run remotely in one script. Prints 0 if even the
+        # smallest size fails.
+        probe_script = """lo=1200
+hi=1500
+probe() { ping -c 2 -W 1 -M do -s $(($1 - 28)) 8.8.8.8 > /dev/null 2>&1; }
+while [ $lo -lt $hi ]; do
+    mid=$(((lo + hi + 1) / 2))
+    if probe $mid; then lo=$mid; else hi=$((mid - 1)); fi
+done
+if probe $lo; then echo $lo; else echo 0; fi
+"""
+        stdout, _, exit_status = self.execute_script(probe_script, sudo=False)
+        fields = stdout.split()
+        if exit_status != 0 or not fields or not fields[-1].isdigit() or fields[-1] == "0":
+            logger.warning(f"MTU probe failed, keeping {self.mtu}")
+            return self.mtu
+            
+        path_mtu = int(fields[-1])
+        logger.info(f"Path MTU to 8.8.8.8 is {path_mtu}")
         
-        # Test connectivity with different MTU values
-        mtu_values = [1280, 1380, 1420, 1480]
+        # Leave room for WireGuard's 80 bytes of outer headers (IPv6 worst
+        # case, 1500 -> 1420 like wg-quick), but never go below IPv6's 1280
+        mtu = max(path_mtu - 80, 1280)
         
-        for test_mtu in mtu_values:
-            logger.info(f"Testing MTU value: {test_mtu}")
+        if mtu == self.mtu:
+            logger.info(f"MTU optimized to {mtu}")
+            return mtu
             
-            # Update MTU in server configuration
-            _, _, exit_status = self.execute_command(
-                f"sudo sed -i 's/MTU = {mtu}/MTU = {test_mtu}/' /etc/wireguard/wg0.conf"
-            )
-            if exit_status != 0:
-                continue
-                
-            # Restart WireGuard with new MTU
-            _, _, exit_status = self.execute_command("sudo systemctl restart wg-quick@wg0")
-            if exit_status != 0:
-                continue
-                
-            # Give it time to apply
-            time.sleep(5)
-            
-            # Test ping with large packet sizes
-            stdout, _, exit_status = self.execute_command(f"ping -c 5 -M do -s {test_mtu - 60} 8.8.8.8")
-            if exit_status == 0 and "100% packet loss" not in stdout and "icmp_seq=" in stdout:
-                # This MTU works well
-                mtu = test_mtu
-                logger.info(f"MTU {test_mtu} works well")
-            else:
-                logger.info(f"MTU {test_mtu} resulted in packet loss")
-        
-        # Update the WireGuard configuration with optimized MTU
-        _, _, exit_status = self.execute_command(
-            f"sudo sed -i 's/MTU = {self.mtu}/MTU = {mtu}/' /etc/wireguard/wg0.conf"
+        # Update the WireGuard configuration with optimized MTU and restart once
+        _, _, exit_status = self.execute_script(
+            f"sed -i 's/MTU = {self.mtu}/MTU = {mtu}/' /etc/wireguard/wg0.conf\n"
+            "systemctl restart wg-quick@wg0\n"
         )
         if exit_status != 0:
-            logger.warning(f"Failed to update server MTU to {mtu}, keeping {self.mtu}")
+            logger.warning(f"Failed to apply optimized MTU {mtu}, keeping {self.mtu}")
             return self.mtu
             
-        # Restart WireGuard with final MTU
-        _, _, exit_status = self.execute_command("sudo systemctl restart wg-quick@wg0")
-        if exit_status != 0:
-            logger.warning("Failed to restart WireGuard with optimized MTU")
-            
         logger.info(f"MTU optimized to {mtu}")
         self.mtu = mtu
         return mtu
         
     def disconnect(self):
         """Close the SSH connection."""
+        if self.use_controlmaster:
+            # The master connection is left running for the next run to reuse
+            return
+            
+        if self.sftp is not None:
+            self.sftp.close()
+            self.sftp = None
+            
         if self.ssh_client:
             self.ssh_client.close()
             logger.info("SSH connection closed")
@@ -526,8 +766,9 @@ exit 0
 
 def main():
     """Main function to configure WireGuard on the EC2 instance."""
-    # Initialize WireGuard configuration
-    wg_config = WireGuardConfig()
+    # Initialize WireGuard configuration (SSH_CONTROLMASTER=1 reuses an
+    # OpenSSH master connection across runs)
+    wg_config = WireGuardConfig(use_controlmaster=os.environ.get('SSH_CONTROLMASTER') == '1')
     
     # Connect to the instance
     if not wg_config.connect():
@@ -576,9 +817,9 @@ def main():
             
         logger.info("WireGuard configuration completed successfully")
         logger.info(f"Server endpoint: {wg_config.server_endpoint}")
-        logger.info(f"Client configuration: ./config/client.conf")
-        logger.info(f"Split tunnel configuration: ./config/client_split_tunnel.conf")
-        logger.info(f"AWS-only configuration: ./config/client_aws_only.conf")
+        logger.info(f"Client configuration: {wg_config.config_dir / 'client.conf'}")
+        logger.info(f"Split tunnel configuration: {wg_config.config_dir / 'client_split_tunnel.conf'}")
+        logger.info(f"AWS-only configuration: {wg_config.config_dir / 'client_aws_only.conf'}")
         
     finally:
         # Disconnect
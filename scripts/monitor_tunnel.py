@@ -21,6 +21,7 @@ import json
 import csv
 import subprocess
 import threading
+import socket
 import smtplib
 import re
 from email.mime.text import MIMEText
@@ -83,7 +84,7 @@ class TunnelMonitor:
         
         # Load optimization agent if available
         try:
-            self.routing_agent = RoutingAgent(model_dir='./models/saved_rl')
+            self.routing_agent = RoutingAgent.for_inference(model_dir='./models/saved_rl')
             logger.info("Loaded routing optimization agent")
         except Exception as e:
             logger.warning(f"Could not load routing optimization agent: {e}")
@@ -239,6 +240,28 @@ class TunnelMonitor:
         
         return metrics
         
+    @staticmethod
+    def _has_route(host='1.1.1.1', port=53):
+        """
+        Check whether the kernel has a route to a host.
+        
+        Connecting a UDP socket only selects the route; no packet is sent and
+        no DNS lookup is made for an IP literal.
+        
+        Args:
+            host: IP address to check
+            port: Port to connect the socket to
+            
+        Returns:
+            bool: True if the host is routable, False otherwise
+        """
+        try:
+            with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+                sock.connect((host, port))
+            return True
+        except OSError:
+            return False
+        
     def _measure_system_stats(self):
         """
         Measure network statistics using system tools.
@@ -255,8 +278,9 @@ class TunnelMonitor:
         
         # Measure latency and packet loss with ping
         try:
-            # Try a few different hosts in case some are unreachable
-            hosts = ['8.8.8.8', '1.1.1.1', 'google.com']
+            # Try a few different hosts in case some are unreachable; without
+            # a route none of them can answer, so don't wait on ping timeouts
+            hosts = ['8.8.8.8', '1.1.1.1', 'google.com'] if self._has_route() else []
             ping_success = False
             
             for host in hosts:
@@ -410,12 +434,12 @@ class TunnelMonitor:
                             'prioritize_aws': False
                         }
                         
-                        new_param_dict = self.routing_agent.apply_action(action, param_dict)
+                        self.routing_agent.apply_action(action, param_dict)
                         
                         # Apply action
                         config_update = {
-                            'mtu': new_param_dict['mtu'],
-                            'direct_tunnel': new_param_dict['direct_tunnel']
+                            'mtu': param_dict['mtu'],
+                            'direct_tunnel': param_dict['direct_tunnel']
                         }
                         
                         result = self.wireguard_mgr.update_config(config_update)
@@ -364,10 +364,10 @@ class RoutingOptimizer:
             'prioritize_aws': self.wg_config.get('prioritize_aws', False)
         }
         
-        new_param_dict = self.agent.apply_action(action, param_dict)
+        self.agent.apply_action(action, param_dict)
         
         # Update the WireGuard configuration
-        self.wg_config.update(new_param_dict)
+        self.wg_config.update(param_dict)
         self._save_wireguard_config()
         
         # Apply changes to the actual WireGuard configuration if manager is available
@@ -376,8 +376,8 @@ class RoutingOptimizer:
             
             # Create config update
             config_update = {
-                'mtu': new_param_dict['mtu'],
-                'direct_tunnel': new_param_dict['direct_tunnel']
+                'mtu': param_dict['mtu'],
+                'direct_tunnel': param_dict['direct_tunnel']
             }
             
             # Apply update
@@ -399,15 +399,15 @@ class RoutingOptimizer:
                 'latency_ms': self.current_metrics.total_latency,
                 'packet_loss_percent': self.current_metrics.packet_loss * 100
             },
-            'parameters': new_param_dict
+            'parameters': param_dict
         })
         
         logger.info(f"Applied action: {self.agent.actions[action]['name']} - {self.agent.actions[action]['description']}")
-        logger.info(f"New parameters: MTU={new_param_dict['mtu']}, "
-                   f"Direct tunnel={new_param_dict['direct_tunnel']}, "
-                   f"Prioritize AWS={new_param_dict['prioritize_aws']}")
+        logger.info(f"New parameters: MTU={param_dict['mtu']}, "
+                   f"Direct tunnel={param_dict['direct_tunnel']}, "
+                   f"Prioritize AWS={param_dict['prioritize_aws']}")
         
-        return new_param_dict
+        return param_dict
         
     def train_agent(self, episodes=100):
         """
@@ -442,8 +442,14 @@ document.addEventListener('DOMContentLoaded', () => {
     function runSpeedTest() {
         appendToTerminal('<div class="text-light"><span class="spinner-border spinner-border-sm text-info me-2"></span>Running speed test... (this may take a moment)</div>');
         
-        fetch('/api/network/speed-test')
+        fetch('/api/network/speed-test', { method: 'POST' })
             .then(response => response.json())
+            .then(job => {
+                if (!job.success) {
+                    throw new Error(job.error || 'Failed to start speed test');
+                }
+                return pollSpeedTest();
+            })
             .then(data => {
                 if (data.success) {
                     const output = `
@@ -486,6 +492,27 @@ document.addEventListener('DOMContentLoaded', () => {
             });
     }
     
+    /**
+     * Poll the speed test status endpoint until the run has finished
+     */
+    function pollSpeedTest() {
+        return new Promise((resolve, reject) => {
+            const check = () => {
+                fetch('/api/network/speed-test/status')
+                    .then(response => response.json())
+                    .then(data => {
+                        if (data.status === 'running') {
+                            setTimeout(check, 2000);
+                        } else {
+                            resolve(data);
+                        }
+                    })
+                    .catch(reject);
+            };
+            setTimeout(check, 2000);
+        });
+    }
+    
     /**
      * Simulate a speed test response (for demonstration)
      */
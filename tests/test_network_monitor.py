@@ -0,0 +1,43 @@
+"""Tests for the network monitor's counter handling."""
+
+import time
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from network_monitor import NetworkMonitor, _HISTORY_DTYPE
+
+
+def test_counter_delta_counts_increase():
+    assert NetworkMonitor._counter_delta(1500, 1000) == 500
+
+
+def test_counter_delta_handles_32_bit_wrap():
+    assert NetworkMonitor._counter_delta(100, (1 << 32) - 400) == 500
+
+
+def test_counter_delta_treats_decrease_as_reset():
+    # wg0 recreated: the counter restarts from 0 instead of wrapping
+    assert NetworkMonitor._counter_delta(2_000, 3_000_000) == 2_000
+    assert NetworkMonitor._counter_delta(2_000, 5 * (1 << 32)) == 2_000
+
+
+def _monitor_with_history(timestamps, cursor):
+    monitor = NetworkMonitor.__new__(NetworkMonitor)
+    monitor._hist = np.zeros(len(timestamps), dtype=_HISTORY_DTYPE)
+    monitor._hist['ts_epoch'] = timestamps
+    monitor._cursor = cursor
+    return monitor
+
+
+def test_stats_history_survives_a_write_after_the_cursor_was_published():
+    now = time.time()
+    # Full ring of 4 with its oldest row at 1; the row at 1 has just been
+    # overwritten with the newest sample, but the cursor still points there
+    monitor = _monitor_with_history([now - 20, now, now - 40, now - 30], (1, 4))
+    
+    timestamps = [datetime.fromisoformat(row['timestamp']).timestamp()
+                  for row in monitor.get_stats_history(hours=1)]
+    
+    assert timestamps == pytest.approx([now - 40, now - 30, now - 20, now], abs=1e-3)
@@ -0,0 +1,34 @@
+"""Tests that the optimizer's NumPy and kernel paths agree."""
+
+import numpy as np
+import pytest
+from dataclasses import replace
+
+from models.network_optimization import NetworkOptimizer, NetworkParameters
+
+
+@pytest.fixture
+def optimizer():
+    # Non-default targets, so a path that ignores them would disagree
+    opt = NetworkOptimizer(NetworkParameters(b_local=0.003, congestion_level=0.3))
+    opt._target_tp, opt._target_lat, opt._target_loss = 0.002, 80.0, 0.05
+    return opt
+
+
+def test_grid_path_matches_kernel(optimizer):
+    mtus, bufs = np.array([1280.0, 1420.0]), np.array([10.0, 500.0])
+    grid = optimizer._calculate_metrics_vec(mtus, bufs, optimizer.params)
+    
+    for i, mtu in enumerate(mtus):
+        for j, buf in enumerate(bufs):
+            params = replace(optimizer.params, mtu=mtu, buffer_size=buf, packet_size=min(mtu - 20, 1400))
+            assert grid['score'][i, j] == pytest.approx(optimizer.calculate_metrics(params).score)
+
+
+def test_bandwidth_path_matches_kernel(optimizer):
+    bandwidths = np.array([0.001, 0.005, 0.02])
+    result = optimizer._calculate_metrics_bandwidths(bandwidths, optimizer.params)
+    
+    for k, b_local in enumerate(bandwidths):
+        expected = optimizer.calculate_metrics(replace(optimizer.params, b_local=b_local)).score
+        assert result['score'][k] == pytest.approx(expected)
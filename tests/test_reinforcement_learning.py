@@ -0,0 +1,45 @@
+"""Tests for the DQN routing agent's training schedule."""
+
+import numpy as np
+import pytest
+
+pytest.importorskip("tensorflow")
+
+from models.reinforcement_learning import RoutingAgent, STATE_DIM
+
+
+def _transitions(n):
+    rng = np.random.default_rng(0)
+    return (
+        rng.uniform(0, 5, size=(n, STATE_DIM)),
+        rng.integers(0, 4, size=n),
+        rng.normal(size=n),
+        rng.uniform(0, 5, size=(n, STATE_DIM)),
+        np.zeros(n, dtype=bool),
+    )
+
+
+def test_batched_transitions_train_like_single_ones(tmp_path):
+    agent = RoutingAgent(batch_size=2, train_every=4, epsilon=1.0, epsilon_decay=0.99,
+                         epsilon_min=0.01, model_dir=tmp_path)
+    
+    # 8 + 10 + 2 transitions: 2 + 2 + 1 training steps, each standing for 4 decays
+    agent.remember_batch(*_transitions(8))
+    agent.remember_batch(*_transitions(10))
+    for state, action, reward, next_state, done in zip(*_transitions(2)):
+        agent.remember(state, action, reward, next_state, done)
+    
+    assert len(agent.loss_history) == 5
+    assert agent._steps_since_train == 0
+    assert agent.epsilon == pytest.approx(0.99 ** 20)
+
+
+def test_numba_backend_acts_on_the_trained_weights(tmp_path):
+    agent = RoutingAgent(batch_size=2, train_every=4, model_dir=tmp_path, inference_backend='numba')
+    agent.remember_batch(*_transitions(8))
+    
+    state = np.array([2.0, 80.0, 1.0])
+    expected = agent.model(agent._normalize_state(state)[None, :]).numpy()[0]
+    agent.choose_action(state, explore=False)
+    
+    assert agent.q_value_history.tolist()[-1] == pytest.approx(expected.max(), rel=1e-4)
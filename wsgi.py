@@ -0,0 +1,16 @@
+"""
+WSGI entry point for production servers.
+
+    gunicorn -k gevent -w 4 --worker-connections 1000 wsgi:app
+"""
+
+# gevent has to patch the stdlib before anything imports socket/threading/subprocess
+try:
+    from gevent import monkey
+    monkey.patch_all()
+except ImportError:
+    pass
+
+from app import create_app
+
+app = create_app()